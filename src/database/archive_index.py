@@ -0,0 +1,326 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import calendar
+import tempfile
+from collections import Counter
+from datetime import datetime, date, timezone
+from pathlib import Path
+
+_U64 = (1 << 64) - 1
+
+def parse_created(date_str):
+    """Parses a chat 'Created' value ('YYYY-MM-DD HH:MM:SS UTC' or ISO). Returns datetime or None."""
+    if not date_str: return None
+    try:
+        if "UTC" in date_str: return datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S UTC")
+        return datetime.fromisoformat(date_str)
+    except: return None
+
+def to_epoch(value, end_of_day=False):
+    """Accepts datetime, date, 'YYYY-MM-DD[ HH:MM]' strings or numbers; returns UTC epoch seconds."""
+    if value is None or value == "": return None
+    if isinstance(value, (int, float)): return int(value)
+    if isinstance(value, str):
+        text = value.strip()
+        try: dt = datetime.fromisoformat(text)
+        except ValueError: return None
+        # A bare date as the end of a range includes that whole day
+        return calendar.timegm(dt.timetuple()) + (86399 if end_of_day and len(text) == 10 else 0)
+    if isinstance(value, datetime): return calendar.timegm(value.timetuple())
+    if isinstance(value, date): return calendar.timegm(value.timetuple()) + (86399 if end_of_day else 0)
+    return None
+
+def fts_query(text):
+    """Turns free user input into a safe FTS5 query: every word must match, the last one as a prefix."""
+    words = [w.replace('"', '""') for w in text.split() if w.strip('"')]
+    if not words: return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+class ArchiveIndex:
+    """
+    SQLite side index for the loaded archive, stored in Local AppData (one file per data root).
+    Chats are re-indexed only when their content signature changes, so reloading an
+    unchanged archive costs one hash pass. Message content lives in an FTS5 table.
+    """
+    SCHEMA_VERSION = 2
+    BATCH = 2000
+
+    def __init__(self):
+        self.conn = None
+        self.reader = None
+        self.db_path = None
+        self.ready = threading.Event()
+        self._lock = threading.RLock()
+        # Queries use their own read-only connection: WAL readers never wait for the sync's writes
+        self._read_lock = threading.Lock()
+        self._generation = 0
+        self._worker = None
+
+    def open(self, data_root):
+        local_dir = os.environ.get('LOCALAPPDATA', os.environ.get('TEMP', tempfile.gettempdir()))
+        index_dir = Path(local_dir) / "SnapCapsule" / "Index"
+        index_dir.mkdir(parents=True, exist_ok=True)
+        root_id = hashlib.md5(os.path.normpath(os.path.abspath(data_root)).encode('utf-8')).hexdigest()
+        db_path = index_dir / f"{root_id}.sqlite"
+        with self._lock:
+            if self.conn and self.db_path == db_path: return
+        # The previous root's sync must not write through the connection being replaced
+        self.close()
+        with self._lock:
+            self.db_path = db_path
+            self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate()
+        with self._read_lock:
+            self.reader = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+    def close(self):
+        self.stop_sync()
+        with self._read_lock:
+            if self.reader:
+                try: self.reader.close()
+                except: pass
+            self.reader = None
+        with self._lock:
+            if self.conn:
+                try: self.conn.close()
+                except: pass
+            self.conn = None
+            self.ready.clear()
+
+    def _migrate(self):
+        c = self.conn
+        version = c.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            c.executescript("""
+                DROP TABLE IF EXISTS messages_fts;
+                DROP TABLE IF EXISTS messages;
+                DROP TABLE IF EXISTS chat_state;
+                DROP TABLE IF EXISTS chat_summary;
+            """)
+        c.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY,
+                chat TEXT NOT NULL,
+                pos INTEGER NOT NULL,
+                sender TEXT,
+                ts INTEGER,
+                content TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_chat ON messages(chat, pos);
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                content, content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TABLE IF NOT EXISTS chat_state (chat TEXT PRIMARY KEY, signature TEXT);
+            CREATE TABLE IF NOT EXISTS audio_meta (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                duration REAL,
+                peaks BLOB
+            );
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                phash INTEGER,
+                dhash INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS content_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS chat_summary (
+                chat TEXT PRIMARY KEY,
+                first_ts INTEGER,
+                last_ts INTEGER,
+                message_count INTEGER,
+                media_count INTEGER,
+                top_sender TEXT
+            );
+        """)
+        c.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        c.commit()
+
+    # --- Indexing ---
+
+    @staticmethod
+    def chat_signature(messages):
+        h = hashlib.md5()
+        for m in messages:
+            h.update(f"{m.get('Created', '')}\x1f{m.get('From', '')}\x1f{m.get('Content') or ''}\x1e".encode('utf-8', 'replace'))
+        return h.hexdigest()
+
+    def sync_chats(self, raw_chats, progress=None, generation=None):
+        """
+        Brings the message index in line with raw_chats. Safe to run on a worker thread;
+        it stops without writing further once a newer sync or a reopen bumps the generation.
+        """
+        if not self.conn: return
+        self.ready.clear()
+        if generation is None: generation = self._generation
+        with self._lock:
+            known = dict(self.conn.execute("SELECT chat, signature FROM chat_state").fetchall())
+
+        stale = [k for k in known if k not in raw_chats]
+        for i, (chat, messages) in enumerate(raw_chats.items()):
+            if generation != self._generation: return
+            signature = self.chat_signature(messages)
+            if known.get(chat) != signature:
+                if not self._reindex_chat(chat, messages, signature, generation): return
+            if progress: progress((i + 1) / max(1, len(raw_chats)))
+
+        with self._lock:
+            if generation != self._generation: return
+            for chat in stale: self._delete_chat(chat)
+            self.conn.commit()
+            self.ready.set()
+
+    def sync_chats_async(self, raw_chats):
+        self.stop_sync()
+        worker = threading.Thread(target=self._safe_sync, args=(raw_chats, self._generation), daemon=True)
+        self._worker = worker
+        worker.start()
+
+    def stop_sync(self):
+        """Cancels a running background sync and waits for it to leave the database."""
+        with self._lock: self._generation += 1
+        worker, self._worker = self._worker, None
+        # Joined outside the lock: the worker needs it to notice the cancel
+        if worker and worker is not threading.current_thread(): worker.join()
+
+    def _safe_sync(self, raw_chats, generation):
+        try: self.sync_chats(raw_chats, generation=generation)
+        except Exception as e: print(f"[ERROR] Message index failed: {e}")
+
+    def _delete_chat(self, chat):
+        c = self.conn
+        # External-content FTS: rows must be removed with their old content
+        c.execute("""INSERT INTO messages_fts(messages_fts, rowid, content)
+                     SELECT 'delete', id, content FROM messages WHERE chat = ? AND content != ''""", (chat,))
+        c.execute("DELETE FROM messages WHERE chat = ?", (chat,))
+        c.execute("DELETE FROM chat_state WHERE chat = ?", (chat,))
+        c.execute("DELETE FROM chat_summary WHERE chat = ?", (chat,))
+
+    def _reindex_chat(self, chat, messages, signature, generation):
+        """Rewrites one chat's rows in a single transaction. False (rolled back) if the sync was cancelled."""
+        rows = []
+        senders = Counter()
+        media_count = 0
+        for pos, m in enumerate(messages):
+            dt = parse_created(m.get("Created", ""))
+            ts = calendar.timegm(dt.timetuple()) if dt else None
+            sender = m.get("From", "Unknown")
+            rows.append((chat, pos, sender, ts, m.get("Content") or ""))
+            senders[sender] += 1
+            mids = m.get("Media IDs", "")
+            if mids: media_count += len(mids) if isinstance(mids, list) else len(str(mids).split(" | "))
+        stamps = [r[3] for r in rows if r[3] is not None]
+        summary = (chat, min(stamps) if stamps else None, max(stamps) if stamps else None, len(rows), media_count,
+                   senders.most_common(1)[0][0] if senders else None)
+
+        with self._lock:
+            if generation != self._generation: return False
+            c = self.conn
+            self._delete_chat(chat)
+            for start in range(0, len(rows), self.BATCH):
+                batch = rows[start:start + self.BATCH]
+                first_id = (c.execute("SELECT IFNULL(MAX(id), 0) FROM messages").fetchone()[0]) + 1
+                c.executemany("INSERT INTO messages(id, chat, pos, sender, ts, content) VALUES (?, ?, ?, ?, ?, ?)",
+                              [(first_id + j,) + r for j, r in enumerate(batch)])
+                c.executemany("INSERT INTO messages_fts(rowid, content) VALUES (?, ?)",
+                              [(first_id + j, r[4]) for j, r in enumerate(batch) if r[4]])
+            c.execute("INSERT OR REPLACE INTO chat_summary VALUES (?, ?, ?, ?, ?, ?)", summary)
+            c.execute("INSERT OR REPLACE INTO chat_state(chat, signature) VALUES (?, ?)", (chat, signature))
+            c.commit()
+        return True
+
+    # --- Queries ---
+
+    def _query(self, sql, args=()):
+        """Rows from the read connection; never blocks on a running sync."""
+        with self._read_lock:
+            if not self.reader: return []
+            return self.reader.execute(sql, args).fetchall()
+
+    def chat_summaries(self):
+        """{chat: {first_ts, last_ts, messages, media, top_sender}} for every indexed conversation."""
+        rows = self._query("SELECT chat, first_ts, last_ts, message_count, media_count, top_sender FROM chat_summary")
+        return {r[0]: {"first_ts": r[1], "last_ts": r[2], "messages": r[3], "media": r[4], "top_sender": r[5]} for r in rows}
+
+    def get_audio_meta(self, path, size, mtime):
+        """(duration, peaks bytes) for an audio file if analyzed at this size/mtime, else None."""
+        rows = self._query("SELECT duration, peaks FROM audio_meta WHERE path = ? AND size = ? AND mtime = ?", (path, size, mtime))
+        return (rows[0][0], bytes(rows[0][1] or b"")) if rows else None
+
+    def save_audio_meta(self, path, size, mtime, duration, peaks):
+        if not self.conn: return
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO audio_meta VALUES (?, ?, ?, ?, ?)", (path, size, mtime, duration, peaks))
+            self.conn.commit()
+
+    def get_fingerprints(self):
+        """{path: (size, mtime, phash, dhash)} with hashes as unsigned 64-bit ints."""
+        rows = self._query("SELECT path, size, mtime, phash, dhash FROM fingerprints")
+        return {r[0]: (r[1], r[2], r[3] & _U64, r[4] & _U64) for r in rows}
+
+    def save_fingerprints(self, rows):
+        """rows: (path, size, mtime, phash, dhash); SQLite integers are signed, so hashes are stored as int64."""
+        if not self.conn: return
+        to_signed = lambda h: h - (1 << 64) if h >= (1 << 63) else h
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?)",
+                                  [(p, size, mtime, to_signed(ph), to_signed(dh)) for p, size, mtime, ph, dh in rows])
+            self.conn.commit()
+
+    def get_content_hashes(self):
+        """{path: (size, mtime, hash)} from earlier storage dedup passes."""
+        rows = self._query("SELECT path, size, mtime, hash FROM content_hashes")
+        return {r[0]: (r[1], r[2], r[3]) for r in rows}
+
+    def save_content_hashes(self, rows):
+        if not self.conn: return
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO content_hashes VALUES (?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def search(self, query, chat=None, date_range=None, limit=50, offset=0):
+        """
+        Ranked (BM25) full-text search over message content.
+        Returns dicts with chat, pos (index in the raw chat list), sender, ts, date and snippet.
+        """
+        match = fts_query(query or "")
+        if not match: return []
+        sql = ["""SELECT m.chat, m.pos, m.sender, m.ts,
+                         snippet(messages_fts, 0, '', '', '…', 12)
+                  FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+                  WHERE messages_fts MATCH ?"""]
+        args = [match]
+        if chat:
+            sql.append("AND m.chat = ?")
+            args.append(chat)
+        if date_range:
+            start, end = to_epoch(date_range[0]), to_epoch(date_range[1], end_of_day=True)
+            if start is not None:
+                sql.append("AND m.ts >= ?")
+                args.append(start)
+            if end is not None:
+                sql.append("AND m.ts <= ?")
+                args.append(end)
+        sql.append("ORDER BY bm25(messages_fts), m.ts DESC LIMIT ? OFFSET ?")
+        args += [int(limit), int(offset)]
+
+        try: rows = self._query(" ".join(sql), args)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Search failed: {e}")
+            return []
+        return [{"chat": r[0], "pos": r[1], "sender": r[2], "ts": r[3],
+                 "date": datetime.fromtimestamp(r[3], timezone.utc).strftime("%Y-%m-%d %H:%M") if r[3] is not None else "",
+                 "snippet": r[4]} for r in rows]
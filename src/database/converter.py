@@ -6,6 +6,7 @@ import re
 from datetime import datetime
 from bs4 import BeautifulSoup
 from pathlib import Path
+from database.matcher import ChatMediaMatcher
 
 class SnapConverter:
     """
@@ -25,6 +26,9 @@ class SnapConverter:
         }
         # Pre-index media folder: {unique_id: [full_filenames]}
         self.media_index = self._build_media_index()
+        # Media messages are matched to files in one pass once every page is parsed
+        self.matcher = ChatMediaMatcher(self.chat_media_path)
+        self._media_msgs = []
 
     def _build_media_index(self):
         """
@@ -88,35 +92,22 @@ class SnapConverter:
         }
 
         if msg_type in ["MEDIA", "IMAGE", "VIDEO"]:
-            data["media_path"] = self._resolve_media(timestamp_str)
+            self.matcher.add(len(self._media_msgs), timestamp_str)
+            self._media_msgs.append(data)
 
         return data
 
-    def _resolve_media(self, timestamp_str):
+    def resolve_media(self):
         """
-        Refined resolution: Matches by timestamp date prefix and filters 
-        for the best candidate.
+        Fills media_path for all parsed media messages: closest unclaimed file by
+        timestamp, primary variants first. Uncertain matches are reported.
         """
-        # Format: 2025-07-05 09:25:12
-        date_part = timestamp_str.split(' ')[0]
-        
-        # Filter chat_media for files starting with this specific date
-        candidates = []
-        if self.chat_media_path.exists():
-            for f in self.chat_media_path.iterdir():
-                if f.name.startswith(date_part):
-                    candidates.append(f)
-        
-        if not candidates:
-            return None
-
-        # If multiple files exist for the same date, we prefer the one 
-        # that isn't an overlay or thumbnail for the primary link.
-        primary_candidates = [c for c in candidates if not any(x in c.name for x in ["overlay", "thumbnail"])]
-        
-        selected = primary_candidates[0] if primary_candidates else candidates[0]
-        return str(selected.absolute())
+        for key, filename in self.matcher.resolve().items():
+            self._media_msgs[key]["media_path"] = str((self.chat_media_path / filename).absolute())
+        for _, timestamp, reason in self.matcher.ambiguous:
+            print(f"[WARN] Chat media {timestamp}: {reason}")
 
     def export_json(self, output_path):
+        self.resolve_media()
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(self.output_data, f, indent=4)
\ No newline at end of file
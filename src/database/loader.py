@@ -1,23 +1,47 @@
 import json
 import os
 from datetime import datetime
+from database.archive_index import ArchiveIndex
+from database.timeline import parse_epoch, parse_filename_epoch
+from database.matcher import match_nearest
+from database.places import PlaceIndex
+from utils.fuzzy_index import FuzzyIndex
+from utils.audio_waveform import waveforms
+from utils.duplicate_finder import duplicates
+from utils.dedup_storage import dedup
+
+VIDEO_EXTS = ('.mp4', '.mov', '.avi')
+AUDIO_EXTS = ('.mp3', '.wav', '.m4a')
 
 class DataManager:
     def __init__(self, config_manager):
         self.cfg = config_manager
         self.media_map = {} 
+        self.media_stats = {}
+        self.memory_files = []
         self.raw_chats = {} 
         self.chat_index = [] 
         self.memories = []
         self.profile = {} 
         self.root = ""
+        self.archive_index = ArchiveIndex()
+        self._chat_media = {}
+        self._quick_index = None
+        self._place_index = None
+        self._memory_place_index = None
 
     def reload(self):
         self.media_map = {}
+        self.media_stats = {}
+        self.memory_files = []
         self.raw_chats = {}
         self.chat_index = []
         self.memories = []
         self.profile = {}
+        self._chat_media = {}
+        self._quick_index = None
+        self._place_index = None
+        self._memory_place_index = None
         
         self.root = self.cfg.get("data_root")
         if not self.root or not os.path.exists(self.root):
@@ -33,7 +57,7 @@ class DataManager:
         if os.path.exists(self.chat_media_path):
             self._index_media_directory(self.chat_media_path)
         if os.path.exists(mem_path):
-            self._index_media_directory(mem_path)
+            self._index_media_directory(mem_path, memories=True)
         
         # Load Chat History
         json_path = os.path.join(data_src, "chat_history.json")
@@ -47,15 +71,30 @@ class DataManager:
                 self.chat_index = sorted(list(self.raw_chats.keys()))
             except Exception as e:
                 print(f"JSON Load Error: {e}")
+
+        # Message search index: only changed conversations are re-indexed, in the background
+        try:
+            self.archive_index.open(self.root)
+            self.archive_index.sync_chats_async(self.raw_chats)
+            waveforms.attach(self.archive_index, self.file_stat)
+            duplicates.attach(self.archive_index, self.file_stat)
+            dedup.attach(self.archive_index)
+        except Exception as e:
+            print(f"[ERROR] Could not open archive index: {e}")
         
         self._parse_memories_list(data_src)
         self._parse_profile_data(data_src)
         self._link_memories_from_map()
+        self.get_quick_index()
 
         return self.chat_index, self.memories, self.profile
 
-    def _index_media_directory(self, folder_path):
-        """Builds a map of filenames and unique Snapchat IDs to full paths."""
+    def _index_media_directory(self, folder_path, memories=False):
+        """
+        Builds a map of filenames and unique Snapchat IDs to full paths, and records
+        (size, mtime) of every file so views never have to stat the archive again.
+        For the memories folder, timestamped files are also collected for linking.
+        """
         if not os.path.exists(folder_path): return
     
         with os.scandir(folder_path) as it:
@@ -64,8 +103,17 @@ class DataManager:
             
                 name = entry.name
                 path = entry.path
+                try:
+                    st = entry.stat()
+                    self.media_stats[path] = (st.st_size, st.st_mtime)
+                except OSError: continue
                 name_no_ext = os.path.splitext(name)[0]
             
+                if memories and not any(x in name for x in ("overlay", "thumbnail")):
+                    # Memory files are named after their capture time: 2019-03-01_12-00-00.jpg
+                    epoch = parse_filename_epoch(name)
+                    if epoch is not None: self.memory_files.append((epoch, path))
+
                 # Map full filename and name without extension
                 self.media_map[name] = path
                 self.media_map[name_no_ext] = path
@@ -83,6 +131,10 @@ class DataManager:
                     if clean_id not in self.media_map or "_image" in name:
                         self.media_map[clean_id] = path
 
+    def file_stat(self, path):
+        """(size, mtime) recorded by the media scan, or None if the file was not found."""
+        return self.media_stats.get(path)
+
     def get_chat_messages(self, friend_name):
         if friend_name not in self.raw_chats: return []
         raw_msgs = self.raw_chats[friend_name]
@@ -120,6 +172,96 @@ class DataManager:
             
         return clean_msgs[::-1]
 
+    def get_chat_media(self, friend_name):
+        """
+        Media index for one conversation, oldest first, computed once per load:
+        dicts with index (position in get_chat_messages), date, path and type (image/video/audio).
+        """
+        if friend_name in self._chat_media: return self._chat_media[friend_name]
+        media = []
+        for i, msg in enumerate(self.get_chat_messages(friend_name)):
+            for path in msg["media"]:
+                ext = os.path.splitext(path)[1].lower()
+                kind = "video" if ext in VIDEO_EXTS else "audio" if ext in AUDIO_EXTS else "image"
+                media.append({"index": i, "date": msg["date"], "path": path, "type": kind})
+        self._chat_media[friend_name] = media
+        return media
+
+    def get_quick_index(self):
+        """
+        Shared trigram index over chat keys, display names and usernames, built once per load.
+        Payloads: {"kind": "chat", "key", "title", "subtitle"} or {"kind": "friend", "username", ...}.
+        """
+        if self._quick_index is not None: return self._quick_index
+        index = FuzzyIndex()
+        friends = self.profile.get("friends_list", [])
+        by_name = {}
+        for f in friends:
+            for name in (f.get("Display Name", ""), f.get("Username", "")):
+                if name: by_name.setdefault(name, f)
+        for key in self.chat_index:
+            f = by_name.get(key, {})
+            display, username = f.get("Display Name", key), f.get("Username", key)
+            index.add([key, display, username], {"kind": "chat", "key": key, "title": display, "subtitle": f"@{username}"})
+        chat_keys = set(self.chat_index)
+        for f in friends:
+            display, username = f.get("Display Name", ""), f.get("Username", "")
+            if display in chat_keys or username in chat_keys: continue
+            index.add([display, username], {"kind": "friend", "username": username, "title": display or username, "subtitle": f"@{username}"})
+        self._quick_index = index
+        return index
+
+    def get_place_index(self):
+        """Spatial/date index over the full Snap Map places history, built once per load."""
+        if self._place_index is None: self._place_index = PlaceIndex(self.profile.get("places", []))
+        return self._place_index
+
+    def get_memory_place_index(self):
+        """Same index over memories that carry a location."""
+        if self._memory_place_index is None:
+            self._memory_place_index = PlaceIndex([m for m in self.memories if m.get("location")], date_key="date", location_key="location")
+        return self._memory_place_index
+
+    def places_near(self, lat, lon, radius_km=25, limit=200):
+        """([(km, place)], [(km, memory)]) within radius_km of (lat, lon), closest first."""
+        places, mems = self.get_place_index(), self.get_memory_place_index()
+        return ([(d, places.items[i]) for d, i in places.near(lat, lon, radius_km, limit=limit)],
+                [(d, mems.items[i]) for d, i in mems.near(lat, lon, radius_km, limit=limit)])
+
+    def search(self, query, friend=None, date_range=None, limit=50, offset=0):
+        """
+        Full-text message search across all conversations, best matches first.
+        friend limits to one chat key; date_range is (start, end) as dates or 'YYYY-MM-DD'.
+        Each hit carries 'index', the message's position in get_chat_messages(hit['chat']).
+        """
+        hits = self.archive_index.search(query, chat=friend, date_range=date_range, limit=limit, offset=offset)
+        for hit in hits:
+            hit["index"] = len(self.raw_chats.get(hit["chat"], [])) - 1 - hit["pos"]
+        return hits
+
+    def get_chat_summaries(self):
+        """
+        Per-conversation summary rows from the archive index (first/last timestamp, message
+        and media counts, top sender). Chats still being indexed are simply absent.
+        """
+        return self.archive_index.chat_summaries()
+
+    def media_paths(self):
+        """Every linked memory and scanned media file."""
+        paths = {m.get("path") for m in self.memories if m.get("exists")}
+        paths.update(self.media_stats)
+        return sorted(paths)
+
+    def find_duplicates(self, radius=4):
+        """Clusters of visually identical memories/chat media, largest first (after the Tools scan)."""
+        return duplicates.clusters(radius)
+
+    def find_similar(self, path, radius=4):
+        return duplicates.similar(path, radius)
+
+    def is_search_ready(self):
+        return self.archive_index.ready.is_set()
+
     def _parse_memories_list(self, data_src):
         possible_paths = [os.path.join(data_src, "memories_history.json"), os.path.join(data_src, "json", "memories_history.json")]
         mem_json = next((p for p in possible_paths if os.path.exists(p)), "")
@@ -129,18 +271,27 @@ class DataManager:
                 data = json.load(f)
                 raw_list = data.get("Saved Media", [])
         except: return
-        self.memories = [{"date": i.get("Date", ""), "type": i.get("Media Type", ""), "path": None, "url": i.get("Media Download Url", "")} for i in raw_list]
+        # Dates are parsed once here; views sort and bucket on the epoch
+        self.memories = [{"date": i.get("Date", ""), "epoch": parse_epoch(i.get("Date", "")), "type": i.get("Media Type", ""),
+                          "path": None, "url": i.get("Media Download Url", ""), "location": i.get("Location", "")} for i in raw_list]
 
     def _link_memories_from_map(self):
+        """
+        Pairs each memory with the memory file whose filename timestamp is nearest to its
+        date, within `memory_link_tolerance` seconds, so small clock skew between the JSON
+        and the filenames no longer leaves memories unlinked. One file per memory.
+        """
+        try: tolerance = max(0, float(self.cfg.get("memory_link_tolerance") or 0))
+        except (TypeError, ValueError): tolerance = 0
+        dated = [m for m in self.memories if m.get('epoch') is not None and "UTC" in m['date']]
+        matches = match_nearest([m['epoch'] for m in dated], [e for e, _ in self.memory_files], tolerance)
+        for i, j in matches.items():
+            dated[i]['path'] = self.memory_files[j][1]
+
         for mem in self.memories:
-            try:
-                date_str = mem['date']
-                if "UTC" in date_str:
-                    dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S UTC")
-                    prefix = dt.strftime("%Y-%m-%d_%H-%M-%S")
-                    if prefix in self.media_map:
-                        mem['path'] = self.media_map[prefix]
-            except: pass
+            stat = self.media_stats.get(mem['path']) if mem['path'] else None
+            mem['exists'] = stat is not None
+            mem['size'] = stat[0] if stat else 0
 
     def _parse_profile_data(self, data_src):
         json_dir = data_src if os.path.exists(os.path.join(data_src, "account.json")) else os.path.join(data_src, "json")
@@ -178,7 +329,7 @@ class DataManager:
                     eng = json.load(f).get("Engagement", [])
                     self.profile['engagement'] = {item["Event"]: item["Occurrences"] for item in eng if isinstance(item, dict) and "Event" in item} if isinstance(eng, list) else {}
             except: pass
-        self.profile['places'] = load_safe("snap_map_places_history.json", "Snap Map Places History")[:100]
+        self.profile['places'] = load_safe("snap_map_places_history.json", "Snap Map Places History")
 
     def perform_integrity_check(self):
         report = {"chats": {"total": 0, "missing": 0}, "memories": {"total": 0, "missing": 0}}
@@ -194,7 +345,6 @@ class DataManager:
                         if mid not in self.media_map: report["chats"]["missing"] += 1
         for mem in self.memories:
             report["memories"]["total"] += 1
-            path = mem.get("path")
-            if not path or not os.path.exists(path):
+            if not mem.get("exists"):
                 report["memories"]["missing"] += 1
         return report
\ No newline at end of file
@@ -0,0 +1,104 @@
+import os
+import time
+from bisect import bisect_left, bisect_right
+from database.timeline import parse_epoch
+
+def match_nearest(left, right, tolerance):
+    """
+    One-to-one nearest-key matching between two lists of numeric keys (e.g. epochs).
+    Each left key is paired with at most one right key within `tolerance` and vice versa;
+    the closest pairs are assigned first, ties go to the earlier entries.
+
+    Right keys are sorted once and each left key takes every candidate in
+    [key - tolerance, key + tolerance] (two bisections), so bursts of equal or
+    nearby keys all find a partner. Returns {left_position: right_position}.
+    """
+    order = sorted((k, j) for j, k in enumerate(right) if k is not None)
+    keys = [k for k, _ in order]
+    edges = []
+    for i, key in enumerate(left):
+        if key is None: continue
+        for p in range(bisect_left(keys, key - tolerance), bisect_right(keys, key + tolerance)):
+            edges.append((abs(keys[p] - key), i, order[p][1]))
+    edges.sort()
+
+    matches, claimed = {}, set()
+    for _, i, j in edges:
+        if i in matches or j in claimed: continue
+        matches[i] = j
+        claimed.add(j)
+    return matches
+
+class ChatMediaMatcher:
+    """
+    Assigns exported HTML media messages to files in chat_media. Files are named
+    'YYYY-MM-DD_<id>.<ext>', so the date is the only timestamp in the name; within a
+    day the file's modification time (kept by the export ZIP) orders the candidates.
+
+    Messages and files are grouped by day and joined with match_nearest on the full
+    timestamp, so every message gets its closest unclaimed file and no file is used twice.
+    Primary files are used before overlay/thumbnail variants. When a day has no usable
+    file times the files are paired in order, and such guesses are reported in `ambiguous`.
+    """
+    VARIANT_MARKERS = ("overlay", "thumbnail")
+
+    def __init__(self, chat_media_path):
+        self.days = {}          # 'YYYY-MM-DD' -> ([primary (name, epoch)], [variant (name, epoch)])
+        self.requests = []      # (key, epoch, day)
+        self.ambiguous = []     # (key, timestamp text, reason)
+        self._labels = {}
+        if not os.path.isdir(chat_media_path): return
+        with os.scandir(chat_media_path) as it:
+            for entry in it:
+                if not entry.is_file() or len(entry.name) < 11 or entry.name[10] != "_": continue
+                day = entry.name[:10]
+                try: mtime = int(entry.stat().st_mtime)
+                except OSError: mtime = None
+                # File times from outside that day (e.g. extraction time) carry no ordering information
+                if mtime is not None and time.strftime("%Y-%m-%d", time.gmtime(mtime)) != day: mtime = None
+                group = self.days.setdefault(day, ([], []))
+                variant = any(x in entry.name for x in self.VARIANT_MARKERS)
+                group[1 if variant else 0].append((entry.name, mtime))
+
+    def add(self, key, timestamp):
+        """Registers a media message; `key` is any hashable the caller uses to fill in the result."""
+        text = timestamp.strip()
+        self.requests.append((key, parse_epoch(text), text[:10]))
+        self._labels[key] = text
+
+    def resolve(self):
+        """{key: file name} for every message that could be matched."""
+        by_day = {}
+        self.ambiguous = []
+        for key, epoch, day in self.requests: by_day.setdefault(day, []).append((epoch, key))
+        result = {}
+        for day, messages in by_day.items():
+            primaries, variants = self.days.get(day, ([], []))
+            messages.sort(key=lambda m: (m[0] is None, m[0] or 0))
+            pending = list(range(len(messages)))
+            for is_variant, files in ((False, primaries), (True, variants)):
+                if not pending or not files: continue
+                files = sorted(files, key=lambda f: (f[1] or 0, f[0]))
+                timed = [i for i, f in enumerate(files) if f[1] is not None]
+                matches = match_nearest([messages[p][0] for p in pending], [files[i][1] for i in timed], 86400)
+                claimed = {timed[j] for j in matches.values()}
+                for mi, j in matches.items():
+                    key = messages[pending[mi]][1]
+                    result[key] = files[timed[j]][0]
+                    if is_variant: self.ambiguous.append((key, self._labels[key], "only an overlay/thumbnail variant was left"))
+                pending = [p for mi, p in enumerate(pending) if mi not in matches]
+                # Left over: untimed messages or untimed files, paired in order
+                free = [f for i, f in enumerate(files) if i not in claimed]
+                guess = len(free) > 1
+                for p, f in zip(list(pending), free):
+                    key = messages[p][1]
+                    result[key] = f[0]
+                    if is_variant: self.ambiguous.append((key, self._labels[key], "only an overlay/thumbnail variant was left"))
+                    elif guess:
+                        reason = "file times unavailable" if f[1] is None else "message time unavailable"
+                        self.ambiguous.append((key, self._labels[key], f"matched by order, {reason}"))
+                pending = pending[len(free):]
+            for p in pending:
+                key = messages[p][1]
+                self.ambiguous.append((key, self._labels[key], "no unclaimed file for this date"))
+        return result
@@ -0,0 +1,113 @@
+import math
+import re
+from array import array
+from database.timeline import parse_epoch, DateIndex
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+EARTH_KM = 6371.0
+
+def parse_location(text):
+    """
+    (lat, lon) from the archive's location strings: '52.37, 4.89', 'Latitude, Longitude: 52.37, 4.89'
+    or '52.37 ± 14.2 meters, 4.89 ± 14.2 meters'. None when missing, malformed or 0, 0 (unknown).
+    """
+    if not text or not isinstance(text, str): return None
+    if ":" in text: text = text.rsplit(":", 1)[1]
+    parts = text.split(",")
+    if len(parts) != 2: return None
+    try:
+        lat, lon = float(_NUMBER.search(parts[0]).group()), float(_NUMBER.search(parts[1]).group())
+    except AttributeError: return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0): return None
+    return lat, lon
+
+def distance_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class PlaceIndex:
+    """
+    Grid index over dated, located items (Snap Map places, located memories).
+    Items are kept newest first; coordinates and epochs live in flat arrays and every
+    position is filed under a CELL-degree grid cell, so viewport and radius queries only
+    visit the cells they overlap. Date ranges are bisections on a DateIndex over the dated
+    items; undated ones sit at the end (`undated`) and only match queries without a range.
+    Items without coordinates stay listed (for the timeline) but are never hit spatially.
+    """
+    CELL = 0.5
+
+    def __init__(self, items, date_key="Date", location_key="Place Location"):
+        parsed = [(parse_epoch(i.get(date_key, "")), i) for i in items]
+        dated = sorted((d for d in parsed if d[0] is not None), key=lambda d: d[0], reverse=True)
+        # Undated items follow the dated ones and are outside every date range
+        self.items = [i for _, i in dated] + [i for e, i in parsed if e is None]
+        self.dates = DateIndex((e for e, _ in dated), descending=True)
+        self.undated = range(len(dated), len(self.items))
+        self.lat, self.lon = array('d'), array('d')
+        self.located = array('b')
+        self.cells = {}
+        for pos, item in enumerate(self.items):
+            loc = parse_location(item.get(location_key))
+            self.located.append(1 if loc else 0)
+            lat, lon = loc or (0.0, 0.0)
+            self.lat.append(lat)
+            self.lon.append(lon)
+            if loc: self.cells.setdefault(self._cell(lat, lon), []).append(pos)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.CELL)), int(math.floor(lon / self.CELL))
+
+    def location(self, pos):
+        return (self.lat[pos], self.lon[pos]) if self.located[pos] else None
+
+    def between(self, start_epoch=None, end_epoch=None):
+        """(first, last + 1) positions of items with start <= epoch < end; either bound may be None."""
+        if not len(self.dates): return 0, 0
+        return self.dates.span(-2 ** 62 if start_epoch is None else start_epoch,
+                               2 ** 62 if end_epoch is None else end_epoch)
+
+    def _in_time(self, start_epoch, end_epoch):
+        if start_epoch is None and end_epoch is None: return None
+        return range(*self.between(start_epoch, end_epoch))
+
+    def _cells_in(self, south, west, north, east):
+        (y0, x0), (y1, x1) = self._cell(south, west), self._cell(north, east)
+        # A viewport crossing the antimeridian has west > east
+        xs = list(range(x0, x1 + 1)) if west <= east else \
+            list(range(x0, self._cell(0, 180)[1] + 1)) + list(range(self._cell(0, -180)[1], x1 + 1))
+        for y in range(y0, y1 + 1):
+            for x in xs:
+                yield from self.cells.get((y, x), ())
+
+    def in_viewport(self, south, west, north, east, start_epoch=None, end_epoch=None):
+        """Positions (newest first) of located items inside the box, optionally within a date range."""
+        span = self._in_time(start_epoch, end_epoch)
+        hits = []
+        for pos in self._cells_in(south, west, north, east):
+            if not (south <= self.lat[pos] <= north): continue
+            lon = self.lon[pos]
+            if not (west <= lon <= east if west <= east else lon >= west or lon <= east): continue
+            if span is None or pos in span: hits.append(pos)
+        hits.sort()
+        return hits
+
+    def near(self, lat, lon, radius_km=25, start_epoch=None, end_epoch=None, limit=None):
+        """[(distance_km, position)] of located items within radius_km of (lat, lon), closest first."""
+        dlat = math.degrees(radius_km / EARTH_KM)
+        coslat = math.cos(math.radians(lat))
+        dlon = 180.0 if coslat < 1e-6 else min(180.0, dlat / coslat)
+        south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        west, east = lon - dlon, lon + dlon
+        if west < -180: west += 360
+        if east > 180: east -= 360
+        if dlon >= 180: west, east = -180.0, 180.0
+        hits = []
+        for pos in self.in_viewport(south, west, north, east, start_epoch, end_epoch):
+            d = distance_km(lat, lon, self.lat[pos], self.lon[pos])
+            if d <= radius_km: hits.append((d, pos))
+        hits.sort()
+        return hits[:limit] if limit else hits
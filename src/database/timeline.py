@@ -0,0 +1,139 @@
+import calendar
+from array import array
+from bisect import bisect_left, bisect_right
+
+MONTH_NAMES = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+def parse_epoch(text):
+    """
+    Fast parser for the archive's timestamp strings ('YYYY-MM-DD HH:MM[:SS][ UTC]' or a bare
+    date). Slices fixed positions instead of strptime; returns UTC epoch seconds or None.
+    """
+    try:
+        y, mo, d = int(text[0:4]), int(text[5:7]), int(text[8:10])
+        h = int(text[11:13]) if len(text) >= 13 else 0
+        mi = int(text[14:16]) if len(text) >= 16 else 0
+        s = int(text[17:19]) if len(text) >= 19 and text[16] == ":" else 0
+        return calendar.timegm((y, mo, d, h, mi, s))
+    except (ValueError, TypeError, IndexError):
+        return None
+
+def parse_filename_epoch(name):
+    """Epoch of a 'YYYY-MM-DD_HH-MM-SS...' file name (memories, repaired media), or None."""
+    if len(name) < 19 or name[10] != "_": return None
+    return parse_epoch(f"{name[:10]} {name[11:19].replace('-', ':')}")
+
+def year_month(epoch):
+    """(year, month) of a UTC epoch."""
+    days = epoch // 86400
+    # Civil-from-days (proleptic Gregorian), avoids datetime objects in tight loops
+    z = days + 719468
+    era = (z if z >= 0 else z - 146096) // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    m = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (1 if m <= 2 else 0), m
+
+class DateIndex:
+    """
+    Sorted epoch array over a chronologically ordered sequence (chat rows, memories).
+    Lookups are bisections; the month histogram is built in one pass.
+    Entries without a date inherit the previous timestamp so the array stays monotonic.
+    """
+
+    def __init__(self, epochs, descending=False):
+        self.descending = descending
+        self.epochs = array('q')
+        last = None
+        for e in epochs:
+            if e is None: e = last if last is not None else 0
+            if last is not None: e = min(e, last) if descending else max(e, last)
+            self.epochs.append(e)
+            last = e
+        self._months = None
+        self._month_starts = None
+
+    def __len__(self):
+        return len(self.epochs)
+
+    @classmethod
+    def from_strings(cls, date_strings, descending=False):
+        return cls((parse_epoch(s) for s in date_strings), descending=descending)
+
+    def index_at(self, epoch):
+        """First position at or after `epoch` in display order (ascending or descending)."""
+        if not self.descending: return min(bisect_left(self.epochs, epoch), len(self.epochs) - 1)
+        # Descending: count entries newer than epoch
+        lo, hi = 0, len(self.epochs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.epochs[mid] > epoch: lo = mid + 1
+            else: hi = mid
+        return min(lo, len(self.epochs) - 1)
+
+    def span(self, start_epoch, end_epoch):
+        """(first, last + 1) positions of entries with start_epoch <= epoch < end_epoch."""
+        if not self.descending:
+            return bisect_left(self.epochs, start_epoch), bisect_left(self.epochs, end_epoch)
+        # Descending: positions are counts of entries newer than each bound
+        def newer_than(epoch):
+            lo, hi = 0, len(self.epochs)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.epochs[mid] >= epoch: lo = mid + 1
+                else: hi = mid
+            return lo
+        return newer_than(end_epoch), newer_than(start_epoch)
+
+    def months(self):
+        """[(year, month, count, first_position)] in display order."""
+        if self._months is None:
+            buckets = []
+            current = None
+            for i, e in enumerate(self.epochs):
+                ym = year_month(e)
+                if ym != current:
+                    buckets.append([ym[0], ym[1], 0, i])
+                    current = ym
+                buckets[-1][2] += 1
+            self._months = [tuple(b) for b in buckets]
+            self._month_starts = [b[3] for b in buckets]
+        return self._months
+
+    def month_at(self, position):
+        """Index into months() of the bucket containing `position`."""
+        self.months()
+        return max(0, bisect_right(self._month_starts, position) - 1)
+
+class FacetHistogram:
+    """
+    Year / month / media-type counts over a set of dated items, built in one pass.
+    Counts are (photos, videos) per (year, month); lookups never touch the items again.
+    """
+
+    def __init__(self, epochs, is_video):
+        self.months = {}
+        for epoch, video in zip(epochs, is_video):
+            if epoch is None: continue
+            bucket = self.months.setdefault(year_month(epoch), [0, 0])
+            bucket[1 if video else 0] += 1
+
+    def years(self):
+        return sorted({y for y, _ in self.months})
+
+    def counts(self, year=None, month=None):
+        """(photos, videos) for everything, a year or a single month."""
+        photos = videos = 0
+        for (y, m), (p, v) in self.months.items():
+            if (year is None or y == year) and (month is None or m == month):
+                photos += p
+                videos += v
+        return photos, videos
+
+    def buckets(self, kind=None, year=None, descending=False):
+        """[((year, month), count)] in display order; kind is None, 'photo' or 'video'."""
+        keys = sorted((k for k in self.months if year is None or k[0] == year), reverse=descending)
+        column = {"photo": (0,), "video": (1,)}.get(kind, (0, 1))
+        return [(k, sum(self.months[k][c] for c in column)) for k in keys]
@@ -1,8 +1,10 @@
 import customtkinter as ctk
+import multiprocessing
 from ui.main_window import MainWindow
 from database.loader import DataManager
 from utils.config_manager import ConfigManager
 from utils.cache_manager import cache
+from utils.proxy_manager import proxies
 import os
 
 def main():
@@ -11,9 +13,12 @@ def main():
     
     # Initialize Cache in standard system location
     cache.init()
+    proxies.init()
 
     app = MainWindow(data_manager, cfg)
     app.mainloop()
 
 if __name__ == "__main__":
+    # Required for the optional decoder subprocess in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -2,6 +2,7 @@ import customtkinter as ctk
 import time
 from ui.theme import *
 from utils.assets import assets
+from utils.audio_waveform import waveforms
 
 try:
     from ffpyplayer.player import MediaPlayer
@@ -20,6 +21,7 @@ class ChatAudioPlayer(ctk.CTkFrame):
         self.playing = False
         self.duration = 0
         self.update_job = None
+        self._progress_value = 0
         
         self.icon_play = assets.load_icon("play", size=(24, 24))
         self.icon_stop = assets.load_icon("pause", size=(24, 24))
@@ -29,12 +31,82 @@ class ChatAudioPlayer(ctk.CTkFrame):
                                         command=self.toggle_playback)
         self.btn_toggle.pack(side="left", padx=10, pady=5)
         
-        self.progress = ctk.CTkProgressBar(self, progress_color=SNAP_BLUE, height=4)
-        self.progress.set(0)
-        self.progress.pack(side="left", fill="x", expand=True, padx=(0, 10))
-        
+        # Waveform drawn from cached peaks; played bars are recoloured instead of redrawn
+        self.peaks = []
+        self.played = 0
+        self.wave = ctk.CTkCanvas(self, height=30, width=160, highlightthickness=0, borderwidth=0,
+                                  bg=self._apply_appearance_mode(BG_CARD))
+        self.wave.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.wave.bind("<Configure>", lambda e: self._draw_wave())
+
         self.lbl_time = ctk.CTkLabel(self, text="0:00", font=("Segoe UI", 10), text_color=TEXT_DIM)
         self.lbl_time.pack(side="right", padx=10)
+        self._load_meta()
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self.wave.configure(bg=self._apply_appearance_mode(BG_CARD))
+        self._draw_wave()
+
+    def _load_meta(self):
+        """Shows duration and waveform from the index; queues analysis if this note is new."""
+        waveforms.cancel(self)
+        meta = waveforms.get(self.path) if self.path else None
+        if meta: self._apply_meta(self.path, *meta)
+        elif self.path:
+            waveforms.request(self.path, lambda d, p, path=self.path: self._apply_meta(path, d, p), owner=self)
+        self._draw_wave()
+
+    def _apply_meta(self, path, duration, peaks):
+        if path != self.path or not self.winfo_exists(): return
+        self.duration = duration
+        self.peaks = list(peaks)
+        if not self.playing: self.lbl_time.configure(text=self._fmt(duration))
+        self._draw_wave()
+
+    @staticmethod
+    def _fmt(seconds):
+        return f"{int(seconds)//60}:{int(seconds)%60:02}"
+
+    def _draw_wave(self):
+        c = self.wave
+        c.delete("all")
+        w, h = max(1, c.winfo_width()), max(1, c.winfo_height())
+        dim = self._apply_appearance_mode(TEXT_DIM)
+        if not self.peaks:
+            c.create_line(0, h / 2, w, h / 2, fill=dim, width=2)
+            return
+        bars = max(1, min(len(self.peaks), w // 3))
+        step = len(self.peaks) / bars
+        for i in range(bars):
+            chunk = self.peaks[int(i * step):max(int(i * step) + 1, int((i + 1) * step))]
+            bar_h = max(2, (h - 4) * max(chunk) / 127)
+            x = i * 3 + 1
+            c.create_line(x, (h - bar_h) / 2, x, (h + bar_h) / 2, fill=dim, width=2, tags=f"b{i}")
+        self.played = 0
+        self._set_progress(self._progress_value)
+
+    def _set_progress(self, value):
+        """Recolours bars up to `value` (0..1)."""
+        self._progress_value = value
+        if not self.peaks: return
+        total = len(self.wave.find_all())
+        target = int(total * value)
+        if target == self.played: return
+        lo, hi = sorted((self.played, target))
+        color = self._apply_appearance_mode(SNAP_BLUE if target > self.played else TEXT_DIM)
+        for i in range(lo, hi): self.wave.itemconfigure(f"b{i}", fill=color)
+        self.played = target
+
+    def set_path(self, file_path):
+        """Rebinds a recycled player to another audio note."""
+        if file_path == self.path: return
+        self.stop()
+        self.path = file_path
+        self.duration = 0
+        self.peaks = []
+        self.lbl_time.configure(text="0:00")
+        self._load_meta()
 
     def toggle_playback(self):
         if not AUDIO_SUPPORT: return
@@ -53,8 +125,8 @@ class ChatAudioPlayer(ctk.CTkFrame):
             self.player = MediaPlayer(self.path, ff_opts={'vn': True, 'sn': True, 'paused': False})
             ChatAudioPlayer._active_player = self
             
-            # Wait briefly for metadata
-            timeout = time.time() + 1.0
+            # Wait briefly for metadata unless the index already knows the duration
+            timeout = time.time() + (0 if self.duration else 1.0)
             while time.time() < timeout:
                 meta = self.player.get_metadata()
                 if meta and meta.get('duration'):
@@ -86,8 +158,8 @@ class ChatAudioPlayer(ctk.CTkFrame):
             
         if self.winfo_exists():
             self.btn_toggle.configure(image=self.icon_play)
-            self.progress.set(0)
-            self.lbl_time.configure(text="0:00")
+            self._set_progress(0)
+            self.lbl_time.configure(text=self._fmt(self.duration) if self.duration else "0:00")
 
     def _update_loop(self):
         if not self.playing or not self.player or not self.winfo_exists():
@@ -96,8 +168,8 @@ class ChatAudioPlayer(ctk.CTkFrame):
         pts = self.player.get_pts()
         if pts is not None:
             if self.duration > 0:
-                self.progress.set(min(pts / self.duration, 1.0))
-                self.lbl_time.configure(text=f"{int(pts)//60}:{int(pts)%60:02}")
+                self._set_progress(min(pts / self.duration, 1.0))
+                self.lbl_time.configure(text=self._fmt(pts))
             
             if self.duration > 0 and pts >= (self.duration - 0.2):
                 self.stop()
@@ -106,5 +178,6 @@ class ChatAudioPlayer(ctk.CTkFrame):
         self.update_job = self.after(100, self._update_loop)
 
     def destroy(self):
+        waveforms.cancel(self)
         self.stop()
         super().destroy()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import os
+import customtkinter as ctk
+from ui.theme import *
+from ui.components.virtual_list import VirtualList
+from utils.thumbnail_service import thumbnails
+from utils.assets import assets
+
+class _ClusterRow(ctk.CTkFrame):
+    """One duplicate group: a caption and a strip of its first thumbnails."""
+    CELL = 110
+    MAX_CELLS = 8
+
+    def __init__(self, parent, on_open):
+        super().__init__(parent, fg_color=BG_CARD, corner_radius=10)
+        self.on_open = on_open
+        self.lbl = ctk.CTkLabel(self, text="", font=("Segoe UI", 12, "bold"), text_color=TEXT_MAIN, anchor="w")
+        self.lbl.pack(fill="x", padx=12, pady=(8, 4))
+        self.strip = ctk.CTkFrame(self, fg_color="transparent")
+        self.strip.pack(fill="x", padx=10, pady=(0, 10))
+        self.cells = []
+
+    def bind_cluster(self, paths):
+        folders = sorted({os.path.basename(os.path.dirname(p)) for p in paths})
+        self.lbl.configure(text=f"{len(paths)} copies · {', '.join(folders)}")
+        shown = paths[:self.MAX_CELLS]
+        while len(self.cells) < len(shown):
+            self.cells.append(ctk.CTkButton(self.strip, text="", width=self.CELL, height=self.CELL,
+                                            fg_color=BG_MAIN, hover_color=BG_HOVER, corner_radius=6))
+        for i, cell in enumerate(self.cells):
+            if i >= len(shown):
+                thumbnails.cancel(cell)
+                cell.pack_forget()
+                continue
+            cell.configure(image=assets.load_icon("image", size=(24, 24)), fg_color=BG_MAIN,
+                           command=lambda x=i: self.on_open(paths, x))
+            cell.pack(side="left", padx=(0, 4))
+            thumbnails.request(cell, shown[i], (self.CELL, self.CELL),
+                               lambda img, status, c=cell: img and c.configure(image=img, fg_color="transparent"))
+
+    def cancel_loads(self):
+        for cell in self.cells: thumbnails.cancel(cell)
+
+class DuplicatesPanel(ctk.CTkFrame):
+    """Virtualized list of duplicate clusters; on_open(paths, index) opens one group in the viewer."""
+
+    def __init__(self, parent, on_open, fg_color="transparent"):
+        super().__init__(parent, fg_color=fg_color, corner_radius=10)
+        self.clusters = []
+        self.on_open = on_open
+        self.list = VirtualList(self, create_row=lambda parent: _ClusterRow(parent, self.on_open),
+                                bind_row=lambda row, i: row.bind_cluster(self.clusters[i]),
+                                unbind_row=lambda row: row.cancel_loads(),
+                                estimate_height=lambda i: _ClusterRow.CELL + 50, fg_color=fg_color)
+        self.list.pack(fill="both", expand=True)
+
+    def yview_scroll(self, number, what="units"):
+        self.list.yview_scroll(number, what)
+
+    def set_clusters(self, clusters):
+        self.clusters = list(clusters)
+        self.list.set_count(len(self.clusters))
@@ -0,0 +1,80 @@
+import math
+import customtkinter as ctk
+from ui.theme import *
+from ui.components.virtual_list import VirtualList
+from utils.thumbnail_service import thumbnails
+from utils.assets import assets
+
+class _GridRow(ctk.CTkFrame):
+    """One recycled row of square thumbnail cells."""
+    def __init__(self, parent, on_open):
+        super().__init__(parent, fg_color="transparent")
+        self.on_open = on_open
+        self.cells = []
+
+    def bind_items(self, items, first_index, cell_size, gap):
+        while len(self.cells) < len(items):
+            self.cells.append(ctk.CTkButton(self, text="", fg_color=BG_CARD, hover_color=BG_HOVER, corner_radius=6))
+        for i, cell in enumerate(self.cells):
+            if i >= len(items):
+                thumbnails.cancel(cell)
+                cell.pack_forget()
+                continue
+            index, path = first_index + i, items[i]
+            cell.configure(width=cell_size, height=cell_size, image=assets.load_icon("image", size=(24, 24)),
+                           fg_color=BG_CARD, command=lambda x=index: self.on_open(x))
+            cell.pack(side="left", padx=(0, gap), pady=(0, gap))
+            thumbnails.request(cell, path, (cell_size, cell_size),
+                               lambda img, status, c=cell: self._apply(c, img, status))
+
+    def _apply(self, cell, ctk_img, status):
+        if ctk_img: cell.configure(image=ctk_img, fg_color="transparent")
+        elif status == "missing": cell.configure(image=assets.load_icon("alert-triangle", size=(24, 24)))
+
+    def cancel_loads(self):
+        for cell in self.cells: thumbnails.cancel(cell)
+
+class MediaGrid(ctk.CTkFrame):
+    """
+    Virtualized grid of square thumbnails over a list of paths. Only visible rows exist;
+    the column count follows the width and the first visible item is kept on reflow.
+    on_open(index) receives the index into the paths list.
+    """
+
+    def __init__(self, parent, on_open, cell_size=150, gap=4, fg_color="transparent"):
+        super().__init__(parent, fg_color=fg_color, corner_radius=0)
+        self.on_open = on_open
+        self.cell_size = cell_size
+        self.gap = gap
+        self.paths = []
+        self.cols = 1
+        self.list = VirtualList(self, create_row=lambda parent: _GridRow(parent, self.on_open),
+                                bind_row=self._bind_row, unbind_row=lambda row: row.cancel_loads(),
+                                estimate_height=lambda i: self.cell_size + self.gap, fg_color=fg_color)
+        self.list.pack(fill="both", expand=True, padx=(10, 0), pady=10)
+        self.list.canvas.bind("<Configure>", self._on_resize, add="+")
+
+    def yview_scroll(self, number, what="units"):
+        self.list.yview_scroll(number, what)
+
+    def set_items(self, paths):
+        self.paths = list(paths)
+        self.cols = self._columns()
+        self.list.set_count(math.ceil(len(self.paths) / self.cols))
+
+    def _columns(self):
+        width = self.list.canvas.winfo_width()
+        if width < 50: width = 900
+        return max(1, width // (self.cell_size + self.gap))
+
+    def _on_resize(self, event=None):
+        cols = self._columns()
+        if cols == self.cols or not self.paths: return
+        first_item = self.list.anchor * self.cols
+        self.cols = cols
+        self.list.set_count(math.ceil(len(self.paths) / cols))
+        self.list.scroll_to(first_item // cols)
+
+    def _bind_row(self, row, index):
+        start = index * self.cols
+        row.bind_items(self.paths[start:start + self.cols], start, self.cell_size, self.gap)
@@ -4,9 +4,17 @@ import cv2
 import os
 import time
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from ui.theme import *
 from utils.assets import assets
+from utils.cache_manager import cache
+from utils.proxy_manager import proxies
 from utils.repair import EnvironmentManager
+from utils.keyframe_index import KeyframeIndex
+from utils.video_decoder import SubprocessFrameSource
+from utils.image_pyramid import ImagePyramid
+from utils.ui_dispatcher import dispatcher
 
 try:
     from ffpyplayer.player import MediaPlayer
@@ -14,8 +22,94 @@ try:
 except ImportError:
     AUDIO_AVAILABLE = False
 
+class Cv2FrameSource:
+    """Default in-process decoder. Frames are scaled to the current bounds on the Tk thread."""
+
+    def __init__(self, path):
+        self.cap = cv2.VideoCapture(path)
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = max(float(self.cap.get(cv2.CAP_PROP_FPS)), 1.0)
+
+    def is_open(self):
+        return self.cap.isOpened()
+
+    def read(self, bounds):
+        ret, frame = self.cap.read()
+        if not ret: return "eof", None, None
+        pos = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+        h, w, _ = frame.shape
+        scale = min(bounds[1]/h, bounds[0]/w)
+        frame = cv2.resize(frame, (int(w*scale), int(h*scale)), interpolation=cv2.INTER_LINEAR)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return "frame", Image.fromarray(frame), pos
+
+    def seek(self, frame_pos, accurate=True):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
+
+    def release(self):
+        self.cap.release()
+
+class FFPyFrameSource:
+    """
+    One ffpyplayer instance for both streams: a single demuxer, file handle and seek.
+    ffmpeg's swscale outputs rgb24 at display size, so no resize or colour conversion
+    happens in Python. Audio/video sync is handled by ffpyplayer (see next_delay).
+    """
+    META_TIMEOUT = 1.5
+
+    def __init__(self, path):
+        self.player = MediaPlayer(path, ff_opts={'out_fmt': 'rgb24', 'sn': True, 'paused': False})
+        self.total_frames = 0
+        self.fps = 30.0
+        self.next_delay = None
+        self._opened = False
+        self._deadline = time.time() + self.META_TIMEOUT
+
+    def poll_metadata(self, bounds):
+        """True once the stream info is known (output size is set then), False after the timeout, None while pending."""
+        if self._opened: return True
+        meta = self.player.get_metadata()
+        src_w, src_h = meta.get('src_vid_size') or (0, 0)
+        if src_w and src_h:
+            num, den = meta.get('frame_rate') or (30, 1)
+            self.fps = max(num / den, 1.0) if den else 30.0
+            self.total_frames = int((meta.get('duration') or 0) * self.fps)
+            self.player.set_output_pix_fmt('rgb24')
+            scale = min(bounds[0] / src_w, bounds[1] / src_h)
+            self.player.set_size(max(2, int(src_w * scale)), max(2, int(src_h * scale)))
+            self._opened = True
+            return True
+        return False if time.time() > self._deadline else None
+
+    def is_open(self):
+        return self._opened
+
+    def read(self, bounds=None):
+        frame, val = self.player.get_frame()
+        if val == 'eof': return "eof", None, None
+        self.next_delay = val if isinstance(val, (int, float)) and val > 0 else 0.005
+        if frame is None: return "wait", None, None
+
+        img, pts = frame
+        w, h = img.get_size()
+        buf = img.to_memoryview()[0]
+        return "frame", Image.frombuffer("RGB", (w, h), buf, "raw", "RGB", 0, 1), int(pts * self.fps)
+
+    def seek(self, frame_pos, accurate=True):
+        # Keyframe-only seeks are cheap previews while scrubbing; the final seek is exact
+        self.player.seek(frame_pos / self.fps, relative=False, accurate=accurate)
+
+    def release(self):
+        try: self.player.close_player()
+        except: pass
+
 class GlobalMediaPlayer(ctk.CTkFrame):
     active_instance = None
+    SEEK_DEBOUNCE_MS = 60
+    MAX_ZOOM = 4.0
+    # Single worker: stale full-resolution renders are skipped by session check
+    _render_pool = ThreadPoolExecutor(max_workers=1)
 
     def __init__(self, parent, playlist, current_index=0):
         if GlobalMediaPlayer.active_instance:
@@ -23,6 +117,7 @@ class GlobalMediaPlayer(ctk.CTkFrame):
         
         root = parent.winfo_toplevel()
         super().__init__(root, fg_color="#000000")
+        self.cfg = getattr(root, "cfg", None)
         
         GlobalMediaPlayer.active_instance = self
         self.place(relx=0, rely=0, relwidth=1, relheight=1)
@@ -30,14 +125,25 @@ class GlobalMediaPlayer(ctk.CTkFrame):
         self.playlist = playlist
         self.index = current_index
         self.session_id = None
+        self.prefer_original = False
         
         self.playing = False
-        self.cap = None
+        self.source = None
         self.player = None
         self.total_frames = 0
         self.fps = 30
         self.duration = 0
         self.job_id = None
+        self.keyframes = None
+        self.scrubbing = False
+        self.pending_seek = None
+        self.seek_job = None
+        self.is_image = False
+        self.pyramid = None
+        self.zoom_scale = None
+        self.zoom_center = (0, 0)
+        self.pan_origin = None
+        self.zoom_render_job = None
         
         self._setup_ui()
         
@@ -52,6 +158,11 @@ class GlobalMediaPlayer(ctk.CTkFrame):
         """Builds the Cinema Mode UI overlay"""
         self.lbl_media = ctk.CTkLabel(self, text="Loading...", text_color="#555")
         self.lbl_media.place(relx=0.5, rely=0.45, anchor="center")
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.lbl_media.bind(seq, self.on_zoom_wheel)
+        self.lbl_media.bind("<ButtonPress-1>", self.on_pan_start)
+        self.lbl_media.bind("<B1-Motion>", self.on_pan_drag)
+        self.lbl_media.bind("<Double-Button-1>", lambda e: self.reset_zoom())
         
         self.top_bar = ctk.CTkFrame(self, fg_color="transparent", height=50)
         self.top_bar.place(relx=0, rely=0, relwidth=1)
@@ -64,6 +175,10 @@ class GlobalMediaPlayer(ctk.CTkFrame):
         
         ctk.CTkButton(self.top_bar, text="", image=assets.load_icon("external-link", size=(18, 18)), width=35, height=35, 
                       fg_color="#222", hover_color="#333", command=self.open_system).pack(side="right", padx=10)
+
+        # Only visible when a playback proxy exists for the current video
+        self.btn_quality = ctk.CTkButton(self.top_bar, text="", width=80, height=35, fg_color="#222", hover_color="#333",
+                                         font=("Segoe UI", 11, "bold"), command=self.toggle_original)
         
         self.btn_prev = ctk.CTkButton(self, text="", image=assets.load_icon("chevron-left", size=(30, 30)), 
                                       width=40, height=80, fg_color="transparent", hover_color="#222", command=self.prev_media)
@@ -85,6 +200,7 @@ class GlobalMediaPlayer(ctk.CTkFrame):
         
         self.slider = ctk.CTkSlider(self.controls_frame, from_=0, to=100, command=self.on_seek)
         self.slider.pack(side="left", fill="x", expand=True, padx=10)
+        self.slider.bind("<ButtonRelease-1>", self.on_seek_release, add="+")
         
         self.lbl_time = ctk.CTkLabel(self.controls_frame, text="00:00 / 00:00", font=("Segoe UI", 12), width=100)
         self.lbl_time.pack(side="left", padx=15)
@@ -105,10 +221,26 @@ class GlobalMediaPlayer(ctk.CTkFrame):
         if self.job_id:
             self.after_cancel(self.job_id)
             self.job_id = None
+
+        if self.seek_job:
+            self.after_cancel(self.seek_job)
+            self.seek_job = None
+        self.scrubbing = False
+        self.pending_seek = None
+        self.keyframes = None
+
+        if self.zoom_render_job:
+            self.after_cancel(self.zoom_render_job)
+            self.zoom_render_job = None
+        self.pyramid = None
+        self.zoom_scale = None
+        self.pan_origin = None
             
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.source:
+            if self.player is getattr(self.source, "player", None):
+                self.player = None # Shared instance is closed by the source
+            self.source.release()
+            self.source = None
             
         if self.player:
             try:
@@ -119,17 +251,32 @@ class GlobalMediaPlayer(ctk.CTkFrame):
             
         self.lbl_media.configure(image="", text="Loading...")
         self.controls_frame.place_forget()
+        self.btn_quality.pack_forget()
 
     def prev_media(self, event=None):
         if self.index > 0:
             self.index -= 1
+            self.prefer_original = False
             self._load_media()
 
     def next_media(self, event=None):
         if self.index < len(self.playlist) - 1:
             self.index += 1
+            self.prefer_original = False
             self._load_media()
 
+    def toggle_original(self):
+        self.prefer_original = not self.prefer_original
+        self._load_media()
+
+    def _resolve_play_path(self, path):
+        """Plays the cached 720p proxy by default when one exists."""
+        proxy = proxies.get(path) if (self.cfg is None or self.cfg.get("use_proxies")) else None
+        if proxy:
+            self.btn_quality.configure(text="Original" if not self.prefer_original else "720p")
+            self.btn_quality.pack(side="right", padx=10)
+        return path if (self.prefer_original or not proxy) else proxy
+
     def toggle_play(self):
         if not self.playing:
             self.playing = True
@@ -153,34 +300,182 @@ class GlobalMediaPlayer(ctk.CTkFrame):
             self._show_error_state("File Missing")
             return
 
-        if self.file_path.lower().endswith(('.jpg', '.jpeg', '.png', '.webp')):
+        self.is_image = self.file_path.lower().endswith(('.jpg', '.jpeg', '.png', '.webp'))
+        if self.is_image:
             self._display_image()
         else:
             self._probe_and_load_video()
 
     def _display_image(self):
+        """Paints the cached grid thumbnail first, then the full image; both load off-thread."""
+        self._render_pool.submit(self._render_full_image, self.session_id, self.file_path, self._image_bounds())
+
+    def _render_full_image(self, sid, path, bounds):
+        if sid != self.session_id: return
+        # The thumbnail is a disk read + decode too, so it stays off the Tk thread
+        preview = cache.get(path)
+        if preview:
+            try:
+                # Cheap upscale; the LANCZOS pass below replaces it
+                preview = ImageOps.contain(preview, bounds, method=Image.Resampling.BILINEAR)
+                dispatcher.post(self._apply_preview, sid, preview)
+            except: pass
+        if sid != self.session_id: return
         from utils.media_resolver import MediaResolver
-        img = MediaResolver.get_display_image(self.file_path) #
-        if img:
-            w, h = max(100, self.winfo_width() - 100), max(100, self.winfo_height() - 250)
-            img = ImageOps.contain(img, (w, h), method=Image.Resampling.LANCZOS)
-            ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
-            self.lbl_media.configure(image=ctk_img, text="")
-        else:
-            self._show_error_state("Invalid Image")
+        img = MediaResolver.get_display_image(path)
+        try:
+            if img: img = ImageOps.contain(img, bounds, method=Image.Resampling.LANCZOS)
+        except: img = None
+        if sid != self.session_id: return
+        dispatcher.post(self._apply_full_image, sid, img)
+
+    def _apply_preview(self, sid, img):
+        if sid != self.session_id or not self.winfo_exists(): return
+        if self.zoom_scale is not None: return
+        self._show_pil_image(img)
+
+    def _apply_full_image(self, sid, img):
+        if sid != self.session_id or not self.winfo_exists(): return
+        if self.zoom_scale is not None: return # Already showing pyramid tiles
+        if img: self._show_pil_image(img)
+        else: self._show_error_state("Invalid Image")
+
+    def _show_pil_image(self, img):
+        ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
+        self.lbl_media.configure(image=ctk_img, text="")
+
+    def _image_bounds(self):
+        return (max(100, self.winfo_width() - 100), max(100, self.winfo_height() - 250))
+
+    # --- Zoom & Pan (tile pyramid, built on first zoom) ---
+
+    def on_zoom_wheel(self, event):
+        if not self.is_image or not self.session_id: return
+        zoom_in = event.num == 4 or getattr(event, "delta", 0) > 0
+        if not self.pyramid:
+            self.pyramid = ImagePyramid(self.file_path) if cache.initialized else None
+            if not self.pyramid: return
+        if not self.pyramid.ready:
+            self._render_pool.submit(self._build_pyramid, self.session_id, self.pyramid)
+            return
+
+        vw, vh = self._image_bounds()
+        fit = self._fit_scale()
+        if self.zoom_scale is None:
+            self.zoom_scale = fit
+            self.zoom_center = (self.pyramid.size[0] / 2, self.pyramid.size[1] / 2)
+
+        new_scale = self.zoom_scale * (1.25 if zoom_in else 0.8)
+        new_scale = max(fit, min(self.MAX_ZOOM, new_scale))
+        # Keep the image point under the cursor fixed while zooming
+        ox, oy = event.x - vw / 2, event.y - vh / 2
+        px = self.zoom_center[0] + ox / self.zoom_scale
+        py = self.zoom_center[1] + oy / self.zoom_scale
+        self.zoom_scale = new_scale
+        self._set_zoom_center(px - ox / new_scale, py - oy / new_scale)
+
+    def _build_pyramid(self, sid, pyramid):
+        if sid != self.session_id or pyramid.ready: return
+        if pyramid.build() and sid == self.session_id:
+            dispatcher.post(self._on_pyramid_ready, sid)
+
+    def _on_pyramid_ready(self, sid):
+        if sid != self.session_id or not self.pyramid: return
+        self.zoom_scale = self._fit_scale() * 1.25
+        self._set_zoom_center(self.pyramid.size[0] / 2, self.pyramid.size[1] / 2)
+
+    def _fit_scale(self):
+        vw, vh = self._image_bounds()
+        w, h = self.pyramid.size
+        return min(vw / w, vh / h)
+
+    def on_pan_start(self, event):
+        if self.zoom_scale is None: return
+        self.pan_origin = (event.x, event.y, self.zoom_center)
+
+    def on_pan_drag(self, event):
+        if self.zoom_scale is None or not self.pan_origin: return
+        x0, y0, (cx, cy) = self.pan_origin
+        self._set_zoom_center(cx - (event.x - x0) / self.zoom_scale, cy - (event.y - y0) / self.zoom_scale)
+
+    def reset_zoom(self):
+        if self.zoom_scale is None: return
+        self.zoom_scale = self._fit_scale()
+        self._set_zoom_center(self.pyramid.size[0] / 2, self.pyramid.size[1] / 2)
+
+    def _set_zoom_center(self, cx, cy):
+        w, h = self.pyramid.size
+        self.zoom_center = (max(0, min(w, cx)), max(0, min(h, cy)))
+        # Coalesce bursts of wheel/motion events into one render per idle cycle
+        if not self.zoom_render_job:
+            self.zoom_render_job = self.after_idle(self._render_zoom)
+
+    def _render_zoom(self):
+        self.zoom_render_job = None
+        if not self.pyramid or self.zoom_scale is None: return
+        try:
+            self._show_pil_image(self.pyramid.render(self._image_bounds(), self.zoom_scale, self.zoom_center))
+        except: pass
+
+    def _video_bounds(self):
+        return (max(50, self.winfo_width() - 150), max(50, self.winfo_height() - 280))
+
+    def _open_frame_source(self, path):
+        decoder = self.cfg.get("video_decoder") if self.cfg else "inprocess"
+        if decoder == "subprocess":
+            # Fixed ring size: frames are produced at the bounds of the window at open time
+            return SubprocessFrameSource(path, self._video_bounds()).start()
+        if decoder == "ffpyplayer" and AUDIO_AVAILABLE:
+            return FFPyFrameSource(path)
+        return Cv2FrameSource(path)
+
+    def _seek_all(self, frame_pos):
+        """Seeks the frame source and, if it is a separate instance, the audio player."""
+        self.source.seek(frame_pos)
+        if self.player and self.player is not getattr(self.source, "player", None):
+            self.player.seek(frame_pos / self.fps, relative=False)
+
+    def _sync_source_meta(self):
+        self.total_frames = max(self.source.total_frames, 1)
+        self.fps = self.source.fps
+        self.duration = self.total_frames / self.fps
 
     def _probe_and_load_video(self):
         try:
-            self.cap = cv2.VideoCapture(self.file_path)
-            if not self.cap.isOpened(): raise Exception()
-            
-            self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            self.fps = max(float(self.cap.get(cv2.CAP_PROP_FPS)), 1.0)
-            self.duration = self.total_frames / self.fps
+            self.play_path = self._resolve_play_path(self.file_path)
+            self.source = self._open_frame_source(self.play_path)
+            if isinstance(self.source, FFPyFrameSource):
+                # Stream info arrives asynchronously; poll it instead of blocking the Tk thread
+                self._await_metadata(self.session_id)
+                return
+            self._start_video()
+        except:
+            self._show_error_state("Playback Failed")
+
+    def _await_metadata(self, sid):
+        if sid != self.session_id or not isinstance(self.source, FFPyFrameSource): return
+        try:
+            state = self.source.poll_metadata(self._video_bounds())
+            if state is None: self.after(10, lambda: self._await_metadata(sid))
+            elif state: self._start_video()
+            else: self._show_error_state("Playback Failed")
+        except:
+            self._show_error_state("Playback Failed")
+
+    def _start_video(self):
+        try:
+            if not self.source.is_open(): raise Exception()
+            self._sync_source_meta()
             
-            if AUDIO_AVAILABLE:
+            if isinstance(self.source, FFPyFrameSource):
+                # Audio comes from the same instance; pause and volume act on it
+                self.player = self.source.player
+            elif AUDIO_AVAILABLE:
                 # Sync audio stream
-                self.player = MediaPlayer(self.file_path, ff_opts={'vn': True})
+                self.player = MediaPlayer(self.play_path, ff_opts={'vn': True})
+            
+            # Keyframe index is built lazily (ffprobe packet scan) and cached with thumbnails
+            threading.Thread(target=self._load_keyframes, args=(self.session_id, self.play_path), daemon=True).start()
             
             self.controls_frame.place(relx=0.5, rely=0.95, relwidth=0.8, anchor="s")
             self.playing = True
@@ -189,41 +484,58 @@ class GlobalMediaPlayer(ctk.CTkFrame):
         except:
             self._show_error_state("Playback Failed")
 
+    def _load_keyframes(self, sid, path):
+        index = KeyframeIndex.load_or_build(path)
+        if sid == self.session_id: self.keyframes = index
+
     def update_video_frame(self, sid):
         """Strict session checking to prevent multiple loops from overlapping"""
-        if sid != self.session_id or not self.cap or not self.playing:
+        if sid != self.session_id or not self.source or not self.playing:
+            return
+
+        if self.scrubbing:
+            # The slider owns the position while dragging; resume once released
+            self.job_id = self.after(100, lambda: self.update_video_frame(sid))
             return
         
         try:
-            ret, frame = self.cap.read()
-            if ret:
-                curr_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+            status, img, curr_frame = self.source.read(self._video_bounds())
+            if status == "frame":
+                self._sync_source_meta()
                 
                 # Update UI only every few frames to save CPU
                 if curr_frame % 5 == 0:
                     self.slider.set((curr_frame/self.total_frames)*100)
                     self._update_time(curr_frame/self.fps)
                 
-                h, w, _ = frame.shape
-                max_h, max_w = max(50, self.winfo_height() - 280), max(50, self.winfo_width() - 150)
-                scale = min(max_h/h, max_w/w)
+                self._show_pil_image(img)
                 
-                frame = cv2.resize(frame, (int(w*scale), int(h*scale)), interpolation=cv2.INTER_LINEAR)
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                ctk_img = ctk.CTkImage(Image.fromarray(frame), size=(int(w*scale), int(h*scale)))
-                self.lbl_media.configure(image=ctk_img, text="")
-                
-                # Dynamic delay to maintain sync
-                delay = max(1, int(1000 / self.fps))
+                # Dynamic delay to maintain sync (ffpyplayer reports its own A/V-synced delay)
+                next_delay = getattr(self.source, "next_delay", None)
+                delay = max(1, int(1000 * next_delay)) if next_delay is not None else max(1, int(1000 / self.fps))
                 self.job_id = self.after(delay, lambda: self.update_video_frame(sid))
+            elif status == "wait":
+                # Subprocess decoder has not produced the next frame yet
+                self.job_id = self.after(5, lambda: self.update_video_frame(sid))
+            elif status == "eof":
+                # Auto-loop logic: Reset both the decoder and the audio player
+                self._seek_all(0)
+                self.job_id = self.after(1, lambda: self.update_video_frame(sid))
             else:
-                # Auto-loop logic: Reset both CV2 and Audio player
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                if self.player:
-                    self.player.seek(0, relative=False)
-                self.update_video_frame(sid)
+                self.playing = False
+                self._show_error_state("Playback Failed")
         except:
             self.playing = False
+
+    def _show_single_frame(self, sid, attempts=40):
+        """Displays the next decoded frame without advancing playback (scrub preview, paused seek)."""
+        if sid != self.session_id or not self.source: return
+        try:
+            status, img, _ = self.source.read(self._video_bounds())
+            if status == "frame": self._show_pil_image(img)
+            elif status == "wait" and attempts > 0:
+                self.after(10, lambda: self._show_single_frame(sid, attempts - 1))
+        except: pass
             
     def toggle_play(self):
         if not self.playing:
@@ -237,10 +549,40 @@ class GlobalMediaPlayer(ctk.CTkFrame):
             if self.player: self.player.toggle_pause()
 
     def on_seek(self, val):
-        if self.cap and self.session_id:
-            pos = int((float(val)/100)*self.total_frames)
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, pos)
-            if self.player: self.player.seek(pos/self.fps, relative=False)
+        """Slider motion: coalesce events and preview the nearest keyframe only."""
+        if not self.source or not self.session_id: return
+        self.scrubbing = True
+        self.pending_seek = float(val)
+        if self.seek_job: self.after_cancel(self.seek_job)
+        self.seek_job = self.after(self.SEEK_DEBOUNCE_MS, self._apply_scrub)
+
+    def _apply_scrub(self):
+        self.seek_job = None
+        if not self.source or self.pending_seek is None: return
+        target = (self.pending_seek / 100) * self.duration
+        if self.keyframes: target = self.keyframes.nearest(target)
+        try:
+            self.source.seek(int(target * self.fps), accurate=False)
+            self._show_single_frame(self.session_id)
+            self._update_time(target)
+        except: pass
+
+    def on_seek_release(self, event=None):
+        """Exact seek (video and audio) once the drag ends."""
+        if not self.source or not self.session_id or self.pending_seek is None:
+            self.scrubbing = False
+            return
+        if self.seek_job:
+            self.after_cancel(self.seek_job)
+            self.seek_job = None
+        pos = int((self.pending_seek / 100) * self.total_frames)
+        self.pending_seek = None
+        self.scrubbing = False
+        try:
+            self._seek_all(pos)
+            if not self.playing: self._show_single_frame(self.session_id)
+            self._update_time(pos/self.fps)
+        except: pass
 
     def on_volume(self, val):
         if self.player: self.player.set_volume(float(val)/100)
@@ -0,0 +1,91 @@
+import customtkinter as ctk
+from ui.theme import *
+from utils.assets import assets
+from utils.fuzzy_index import parse_month_expression, MONTHS
+
+class QuickSwitcher(ctk.CTkFrame):
+    """
+    Ctrl+K overlay: fuzzy search over chats and friends via the shared trigram index,
+    plus date expressions ('mar 2019', '2019-03') that jump to a memories month.
+    on_pick(payload) receives the chosen result.
+    """
+    MAX_RESULTS = 8
+    _instance = None
+
+    def __init__(self, root, quick_index, on_pick):
+        super().__init__(root, fg_color=BG_SIDEBAR, corner_radius=14, border_width=1, border_color=BG_HOVER, width=520)
+        QuickSwitcher._instance = self
+        self.quick_index = quick_index
+        self.on_pick = on_pick
+        self.results = []
+        self.selected = 0
+        self.rows = []
+
+        self.entry = ctk.CTkEntry(self, placeholder_text="Jump to a chat, friend or month (e.g. mar 2019)...",
+                                  height=40, font=("Segoe UI", 14), fg_color=BG_MAIN, border_width=0)
+        self.entry.pack(fill="x", padx=12, pady=12)
+        self.list_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.list_frame.pack(fill="x", padx=8, pady=(0, 10))
+        for i in range(self.MAX_RESULTS):
+            row = ctk.CTkButton(self.list_frame, text="", anchor="w", height=36, fg_color="transparent",
+                                hover_color=BG_HOVER, text_color=TEXT_MAIN, font=("Segoe UI", 13),
+                                command=lambda x=i: self._pick(x))
+            self.rows.append(row)
+
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Escape>", lambda e: self.close())
+        self.entry.bind("<Return>", lambda e: self._pick(self.selected))
+        self.entry.bind("<Down>", lambda e: self._move(1))
+        self.entry.bind("<Up>", lambda e: self._move(-1))
+
+        self.place(relx=0.5, rely=0.12, anchor="n")
+        self.lift()
+        self.entry.focus_set()
+
+    @classmethod
+    def toggle(cls, root, quick_index, on_pick):
+        if cls._instance and cls._instance.winfo_exists():
+            cls._instance.close()
+            return None
+        return cls(root, quick_index, on_pick)
+
+    def close(self):
+        QuickSwitcher._instance = None
+        self.destroy()
+
+    def _on_key(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape"): return
+        query = self.entry.get().strip()
+        results = []
+        month = parse_month_expression(query) if query else None
+        if month:
+            year, m = month
+            title = f"{MONTHS[m - 1].title()} {year}" if m else str(year)
+            results.append({"kind": "month", "year": year, "month": m, "title": f"Memories · {title}", "subtitle": ""})
+        if query: results += self.quick_index.search(query, limit=self.MAX_RESULTS - len(results))
+        self.results = results
+        self.selected = 0
+        self._render()
+
+    def _render(self):
+        icons = {"chat": "message-square", "friend": "user", "month": "calendar"}
+        for i, row in enumerate(self.rows):
+            if i >= len(self.results):
+                row.pack_forget()
+                continue
+            r = self.results[i]
+            text = f"  {r['title']}" + (f"   {r['subtitle']}" if r.get("subtitle") else "")
+            row.configure(text=text, image=assets.load_icon(icons.get(r["kind"], "search"), size=(16, 16)),
+                          fg_color=BG_HOVER if i == self.selected else "transparent")
+            row.pack(fill="x", pady=1)
+
+    def _move(self, step):
+        if not self.results: return
+        self.selected = (self.selected + step) % len(self.results)
+        self._render()
+
+    def _pick(self, index):
+        if index >= len(self.results): return
+        payload = self.results[index]
+        self.close()
+        self.on_pick(payload)
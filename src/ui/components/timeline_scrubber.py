@@ -0,0 +1,97 @@
+import math
+import customtkinter as ctk
+from ui.theme import *
+
+class TimelineScrubber(ctk.CTkFrame):
+    """
+    Compact month histogram with a position marker. Clicking or dragging calls
+    on_select(bucket_index); the owner maps buckets to list positions.
+    Buckets are (label, count) pairs in display order.
+    """
+
+    def __init__(self, parent, on_select, width=360, height=40, fg_color="transparent", bar_color=SNAP_BLUE):
+        super().__init__(parent, fg_color=fg_color, width=width, height=height)
+        self.on_select = on_select
+        self.bar_color = bar_color
+        self.buckets = []
+        self.marker = None
+        self._last_selected = None
+        self.describe = None    # optional describe(index) -> label text
+
+        self.canvas = ctk.CTkCanvas(self, height=height - 14, highlightthickness=0, borderwidth=0,
+                                    bg=self._apply_appearance_mode(BG_SIDEBAR))
+        self.canvas.pack(fill="both", expand=True)
+        self.lbl = ctk.CTkLabel(self, text="", font=("Segoe UI", 10), text_color=TEXT_DIM, height=14)
+        self.lbl.pack(fill="x")
+        self.canvas.bind("<Configure>", lambda e: self._draw())
+        self.canvas.bind("<Button-1>", self._on_pointer)
+        self.canvas.bind("<B1-Motion>", self._on_pointer)
+        self.canvas.bind("<ButtonRelease-1>", lambda e: setattr(self, "_last_selected", None))
+        self.canvas.bind("<Motion>", self._on_hover)
+        self.canvas.bind("<Leave>", lambda e: self._show_label(self.marker))
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self.canvas.configure(bg=self._apply_appearance_mode(BG_SIDEBAR))
+        self._draw()
+
+    def set_buckets(self, buckets):
+        self.buckets = list(buckets)
+        self.marker = None
+        self._draw()
+        self._show_label(None)
+
+    def set_marker(self, index):
+        if index == self.marker: return
+        self.marker = index
+        self._draw_marker()
+        self._show_label(index)
+
+    def _bucket_at(self, x):
+        if not self.buckets: return None
+        w = max(1, self.canvas.winfo_width())
+        return max(0, min(len(self.buckets) - 1, int(x / w * len(self.buckets))))
+
+    def _on_pointer(self, event):
+        index = self._bucket_at(event.x)
+        if index is None or index == self._last_selected: return
+        self._last_selected = index
+        self.set_marker(index)
+        self.on_select(index)
+
+    def _on_hover(self, event):
+        self._show_label(self._bucket_at(event.x))
+
+    def _show_label(self, index):
+        if index is None or not self.buckets:
+            self.lbl.configure(text=f"{len(self.buckets)} months" if self.buckets else "")
+            return
+        if self.describe:
+            self.lbl.configure(text=self.describe(index))
+            return
+        label, count = self.buckets[index]
+        self.lbl.configure(text=f"{label} · {count:,}")
+
+    def _draw(self):
+        c = self.canvas
+        c.delete("all")
+        if not self.buckets: return
+        w, h = max(1, c.winfo_width()), max(1, c.winfo_height())
+        peak = max(count for _, count in self.buckets) or 1
+        step = w / len(self.buckets)
+        color = self._apply_appearance_mode(self.bar_color)
+        # Log scale keeps quiet months visible next to very busy ones
+        scale = math.log1p(peak)
+        for i, (_, count) in enumerate(self.buckets):
+            if not count: continue
+            bar_h = max(2, (h - 2) * math.log1p(count) / scale)
+            c.create_rectangle(i * step, h - bar_h, max(i * step + 1, (i + 1) * step - 1), h, fill=color, width=0)
+        self._draw_marker()
+
+    def _draw_marker(self):
+        c = self.canvas
+        c.delete("marker")
+        if self.marker is None or not self.buckets: return
+        w, h = max(1, c.winfo_width()), max(1, c.winfo_height())
+        x = (self.marker + 0.5) * w / len(self.buckets)
+        c.create_line(x, 0, x, h, fill=self._apply_appearance_mode(SNAP_YELLOW), width=2, tags="marker")
@@ -0,0 +1,212 @@
+import sys
+import customtkinter as ctk
+
+# Pixels per wheel "unit", matching CTkScrollableFrame's scroll increments
+if sys.platform.startswith("win"): SCROLL_UNIT_PX = 1
+elif sys.platform == "darwin": SCROLL_UNIT_PX = 8
+else: SCROLL_UNIT_PX = 30
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that keeps a small pool of row widgets and rebinds them to data
+    as the user scrolls. The position is anchored on (first visible row, pixel offset
+    into it), so scrolling and jumping cost the same for 50 rows or 100k rows.
+    Row heights are measured once bound and estimated for rows never shown.
+
+    create_row(parent) -> widget, bind_row(widget, index) and estimate_height(index)
+    are supplied by the owning view; unbind_row(widget) runs when a row leaves the view.
+    """
+
+    def __init__(self, parent, create_row, bind_row, estimate_height=None, unbind_row=None,
+                 fg_color="transparent", **kwargs):
+        super().__init__(parent, fg_color=fg_color, corner_radius=0, **kwargs)
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.unbind_row = unbind_row
+        self.estimate_height = estimate_height or (lambda index: 60)
+        self.on_range_changed = None
+        self._last_range = None
+
+        self.count = 0
+        self.anchor = 0
+        self.offset = 0
+        self.heights = {}
+        self.active = {}    # index -> row widget
+        self.pool = []      # unbound row widgets
+        self.items = {}     # row widget -> canvas window id
+        self._layout_job = None
+
+        self.canvas = ctk.CTkCanvas(self, highlightthickness=0, borderwidth=0, bg=self._canvas_bg())
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+
+    def _canvas_bg(self):
+        color = self.cget("fg_color")
+        if color == "transparent": color = self.cget("bg_color")
+        return self._apply_appearance_mode(color)
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self.canvas.configure(bg=self._canvas_bg())
+
+    # --- Public API ---
+
+    def set_count(self, count, keep_position=False):
+        """Rebinds the list to a new data length; all rows are released to the pool."""
+        for index in list(self.active): self._release(index)
+        self.count = count
+        self.heights = {}
+        self._last_range = None
+        if not keep_position: self.anchor, self.offset = 0, 0
+        self.anchor = max(0, min(self.anchor, count - 1))
+        self.refresh()
+
+    def refresh(self, rebind=False):
+        if rebind:
+            for index in list(self.active): self._release(index)
+        self._schedule_layout()
+
+    def scroll_to(self, index, align="top"):
+        if self.count == 0: return
+        index = max(0, min(index, self.count - 1))
+        if align == "bottom":
+            self._align_bottom(index)
+        else:
+            self.anchor, self.offset = index, 0
+            self._clamp_end()
+        self._schedule_layout()
+
+    def scroll_to_end(self):
+        self.scroll_to(self.count - 1, align="bottom")
+
+    def yview_scroll(self, number, what="units"):
+        px = number * (self._viewport_height() * 0.9 if what == "pages" else SCROLL_UNIT_PX)
+        self.scroll_by(px)
+
+    def scroll_by(self, px):
+        if self.count == 0: return
+        self.offset += px
+        while self.offset < 0 and self.anchor > 0:
+            self.anchor -= 1
+            self.offset += self._height(self.anchor)
+        self.offset = max(0, self.offset)
+        while self.anchor < self.count - 1 and self.offset >= self._height(self.anchor):
+            self.offset -= self._height(self.anchor)
+            self.anchor += 1
+        self._clamp_end()
+        self._schedule_layout()
+
+    def visible_range(self):
+        if not self.active: return (0, -1)
+        return (min(self.active), max(self.active))
+
+    def row_for(self, index):
+        return self.active.get(index)
+
+    # --- Geometry ---
+
+    def _viewport_height(self):
+        return max(1, self.canvas.winfo_height())
+
+    def _height(self, index):
+        return self.heights.get(index) or self.estimate_height(index)
+
+    def _align_bottom(self, index):
+        """Positions the anchor so that `index` ends exactly at the bottom edge."""
+        vh = self._viewport_height()
+        i, total = index, self._height(index)
+        while total < vh and i > 0:
+            i -= 1
+            total += self._height(i)
+        self.anchor, self.offset = i, max(0, total - vh)
+
+    def _clamp_end(self):
+        vh = self._viewport_height()
+        total, i = -self.offset, self.anchor
+        while i < self.count and total < vh:
+            total += self._height(i)
+            i += 1
+        if total < vh: self._align_bottom(self.count - 1)
+
+    def _on_scrollbar(self, command, *args):
+        if command == "moveto":
+            pos = max(0.0, min(1.0, float(args[0]))) * self.count
+            self.anchor = min(int(pos), max(0, self.count - 1))
+            self.offset = (pos - self.anchor) * self._height(self.anchor)
+            self._clamp_end()
+            self._schedule_layout()
+        elif command == "scroll":
+            self.yview_scroll(int(args[0]), args[1] if len(args) > 1 else "units")
+
+    # --- Layout ---
+
+    def _schedule_layout(self):
+        if not self._layout_job:
+            self._layout_job = self.after_idle(self._layout)
+
+    def _new_row(self):
+        row = self.create_row(self.canvas)
+        self.items[row] = self.canvas.create_window(0, 0, window=row, anchor="nw", state="hidden")
+        row.bind("<Configure>", lambda e, w=row: self._on_row_configure(w, e.height), add="+")
+        return row
+
+    def _release(self, index):
+        row = self.active.pop(index)
+        if self.unbind_row: self.unbind_row(row)
+        self.canvas.itemconfigure(self.items[row], state="hidden")
+        self.pool.append(row)
+
+    def _on_row_configure(self, row, height):
+        # Rows grow once async content (thumbnails) arrives; relayout only on real changes
+        for index, w in self.active.items():
+            if w is row:
+                if self.heights.get(index) != height and height > 1: self._schedule_layout()
+                return
+
+    def _layout(self):
+        self._layout_job = None
+        if not self.winfo_exists(): return
+        vh, vw = self._viewport_height(), self.canvas.winfo_width()
+        if self.count == 0:
+            for index in list(self.active): self._release(index)
+            self.scrollbar.set(0, 1)
+            return
+
+        # Bind until the viewport is filled, measuring freshly bound rows in one idle pass
+        for _ in range(4):
+            needed, y, i = [], -self.offset, self.anchor
+            while i < self.count and y < vh:
+                needed.append(i)
+                y += self._height(i)
+                i += 1
+
+            for index in [k for k in self.active if k not in needed]: self._release(index)
+            fresh = []
+            for index in needed:
+                if index in self.active: continue
+                row = self.pool.pop() if self.pool else self._new_row()
+                self.bind_row(row, index)
+                self.canvas.itemconfigure(self.items[row], width=vw)
+                self.active[index] = row
+                fresh.append(index)
+            if not fresh: break
+            self.canvas.update_idletasks()
+            for index in fresh: self.heights[index] = max(1, self.active[index].winfo_reqheight())
+
+        y = -self.offset
+        for index in sorted(self.active):
+            row = self.active[index]
+            self.heights[index] = max(1, row.winfo_reqheight())
+            self.canvas.coords(self.items[row], 0, y)
+            self.canvas.itemconfigure(self.items[row], width=vw, state="normal")
+            y += self.heights[index]
+
+        first = (self.anchor + self.offset / self._height(self.anchor)) / self.count
+        span = len(self.active) / self.count
+        self.scrollbar.set(first, min(1.0, first + span))
+        visible = self.visible_range()
+        if self.on_range_changed and visible != self._last_range:
+            self._last_range = visible
+            self.on_range_changed(*visible)
@@ -9,7 +9,9 @@ from ui.views.settings_view import SettingsView
 from ui.views.tools_view import ToolsView
 from ui.theme import *
 from utils.assets import assets
+from utils.ui_dispatcher import dispatcher
 from ui.components.media_viewer import GlobalMediaPlayer
+from ui.components.quick_switcher import QuickSwitcher
 
 SCROLL_SPEED = 20
 
@@ -48,11 +50,14 @@ class MainWindow(ctk.CTk):
         self.view_settings = None
         self.view_tools = None
 
+        dispatcher.start(self)
         self._setup_ui()
         
         self.bind_all("<MouseWheel>", self._on_global_mouse_wheel)
         self.bind_all("<Button-4>", self._on_global_mouse_wheel)
         self.bind_all("<Button-5>", self._on_global_mouse_wheel)
+        self.bind_all("<Control-k>", self.open_quick_switcher)
+        self.bind_all("<Control-K>", self.open_quick_switcher)
 
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.show_home_view()
@@ -153,7 +158,7 @@ class MainWindow(ctk.CTk):
         self._hide_all_views()
         self._update_active_tab("profile")
         if not self.view_profile:
-            self.view_profile = ProfileView(self.content_frame, self.profile)
+            self.view_profile = ProfileView(self.content_frame, self.profile, self.data_manager)
         self.view_profile.grid(row=0, column=0, sticky="nsew")
 
     def show_memories_view(self):
@@ -177,7 +182,26 @@ class MainWindow(ctk.CTk):
             self.view_tools = ToolsView(self.content_frame, self.cfg, self.data_manager)
         self.view_tools.grid(row=0, column=0, sticky="nsew")
 
+    def open_quick_switcher(self, event=None):
+        if GlobalMediaPlayer.active_instance: return
+        QuickSwitcher.toggle(self, self.data_manager.get_quick_index(), self._on_quick_pick)
+        return "break"
+
+    def _on_quick_pick(self, payload):
+        kind = payload.get("kind")
+        if kind == "chat":
+            self.show_chats_view()
+            self.view_chat.load_chat(payload["key"])
+        elif kind == "friend":
+            self.show_profile_view()
+            self.view_profile.focus_friend(payload["username"])
+        elif kind == "month":
+            self.show_memories_view()
+            self.view_memories.jump_to_month(payload["year"], payload["month"])
+
     def _on_global_mouse_wheel(self, event):
+        # The media overlay handles its own wheel (zoom); never scroll views underneath it
+        if GlobalMediaPlayer.active_instance: return
         x, y = self.winfo_pointerxy()
         widget = self.winfo_containing(x, y)
         if not widget: return
@@ -189,12 +213,17 @@ class MainWindow(ctk.CTk):
             target = self.view_memories.scroll_mems
         elif self.view_chat and self.view_chat.winfo_ismapped():
             if is_inside(self.view_chat.scroll_friends): target = self.view_chat.scroll_friends
+            elif is_inside(self.view_chat.hit_list): target = self.view_chat.hit_list
+            elif self.view_chat.gallery.winfo_ismapped(): target = self.view_chat.gallery
             else: target = self.view_chat.scroll_chat
         elif self.view_profile and self.view_profile.winfo_ismapped():
             if hasattr(self.view_profile, 'friends_scroll') and is_inside(self.view_profile.friends_scroll): target = self.view_profile.friends_scroll
             elif hasattr(self.view_profile, 'device_scroll') and is_inside(self.view_profile.device_scroll): target = self.view_profile.device_scroll
             elif hasattr(self.view_profile, 'name_scroll') and is_inside(self.view_profile.name_scroll): target = self.view_profile.name_scroll
             elif hasattr(self.view_profile, 'map_scroll') and is_inside(self.view_profile.map_scroll): target = self.view_profile.map_scroll
+        elif self.view_tools and self.view_tools.winfo_ismapped():
+            panel = self.view_tools.duplicates_panel
+            if panel and panel.winfo_ismapped() and is_inside(panel): target = panel
         if target:
             try:
                 steps = 0
@@ -202,5 +231,6 @@ class MainWindow(ctk.CTk):
                 elif event.num == 4: steps = -1 * SCROLL_SPEED
                 elif event.num == 5: steps = 1 * SCROLL_SPEED
                 if steps == 0: return
-                target._parent_canvas.yview_scroll(steps, "units")
+                scroller = target if hasattr(target, "yview_scroll") else target._parent_canvas
+                scroller.yview_scroll(steps, "units")
             except: pass
\ No newline at end of file
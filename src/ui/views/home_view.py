@@ -4,6 +4,7 @@ import threading
 import webbrowser
 from tkinter import filedialog
 from utils.downloader import MemoryDownloader
+from utils.ui_dispatcher import dispatcher
 from PIL import Image
 from ui.theme import *
 from utils.assets import assets
@@ -85,7 +86,8 @@ class HomeView(ctk.CTkFrame):
 
         self.is_processing = True
         self.btn_main.configure(state="disabled", text=" Processing...")
-        self.downloader = MemoryDownloader(self.update_status, self.update_progress)
+        # The downloader reports from worker threads; only the latest status/progress per frame is drawn
+        self.downloader = MemoryDownloader(dispatcher.wrap_latest(self.update_status), dispatcher.wrap_latest(self.update_progress))
         
         threading.Thread(target=self._run_zip_pipeline, args=(zip_path, dest_root), daemon=True).start()
 
@@ -98,12 +100,12 @@ class HomeView(ctk.CTkFrame):
             if success:
                 # Step 2: Auto-Discovery via DataManager
                 actual_folder = self.downloader._find_snap_root(dest_p)
-                self.after(0, lambda: self.finalize_import(actual_folder))
+                dispatcher.post(self.finalize_import, actual_folder)
             else:
-                self.after(0, self.reset_ui)
+                dispatcher.post(self.reset_ui)
         except Exception as e:
-            self.after(0, lambda: self.update_status(f"Error: {str(e)}"))
-            self.after(0, self.reset_ui)
+            dispatcher.post(self.update_status, f"Error: {str(e)}")
+            dispatcher.post(self.reset_ui)
 
     def finalize_import(self, folder_path):
         """Saves configuration and reloads application state."""
@@ -116,8 +118,8 @@ class HomeView(ctk.CTkFrame):
         self.app.chat_index, self.app.memories, self.app.profile = chat_idx, mems, profile
         
         # Cleanup view pointers to force fresh render on next tab click
-        if self.app.view_chat: self.app.view_chat.populate_friends(chat_idx)
-        if self.app.view_memories: self.app.view_memories.load_page(1)
+        if self.app.view_chat: self.app.view_chat.set_chat_index(chat_idx)
+        if self.app.view_memories: self.app.view_memories.set_memories(mems)
         
         self.update_status("Import Successful!")
         self.reset_ui()
@@ -1,36 +1,47 @@
 import customtkinter as ctk
-from PIL import Image, ImageOps
-import os
 import math
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
-from utils.image_utils import extract_video_thumbnail, add_play_icon
+import calendar
+from bisect import bisect_right
+from utils.thumbnail_service import thumbnails, VIDEO_EXTS
 from ui.theme import *
 from ui.components.media_viewer import GlobalMediaPlayer
+from ui.components.virtual_list import VirtualList
+from ui.components.timeline_scrubber import TimelineScrubber
+from database.timeline import DateIndex, FacetHistogram, parse_epoch
+from utils.fuzzy_index import MONTHS
 from utils.assets import assets
 
+CARD_HEIGHT = 200
+ROW_HEIGHT = CARD_HEIGHT + 5
+HEADER_HEIGHT = 44
+
 class MemoryCard(ctk.CTkFrame):
-    def __init__(self, parent, memory, width, click_callback, executor):
-        super().__init__(parent, fg_color="transparent", width=width, height=200)
+    """Recyclable thumbnail card; bind() points it at another memory."""
+    def __init__(self, parent, click_callback):
+        super().__init__(parent, fg_color="transparent", width=200, height=CARD_HEIGHT)
         self.pack_propagate(False) 
-        self.path = memory.get('path')
+        self.path = None
+        self.card_width = 200
         self.click_callback = click_callback
-        self.executor = executor
-        self.is_destroyed = False # Safety flag for threaded updates
         
         self.btn = ctk.CTkButton(self, text="", fg_color=BG_CARD, hover_color=BG_HOVER,
                                  corner_radius=6, command=lambda: self.click_callback(self.path))
         self.btn.pack(expand=True, fill="both", padx=2, pady=2)
-        
+
+    def bind(self, memory, width, priority=0):
+        self.path = memory.get('path')
+        if width != self.card_width:
+            self.card_width = width
+            self.configure(width=width)
         self._set_placeholder_state(is_loading=True)
-        self.load_image()
+        self.load_image(priority)
 
     def destroy(self):
-        self.is_destroyed = True
+        thumbnails.cancel(self)
         super().destroy()
 
     def _set_placeholder_state(self, is_missing=False, is_loading=False):
-        if self.is_destroyed or not self.winfo_exists(): return
+        if not self.winfo_exists(): return
         
         if is_loading:
             icon_name = "image"
@@ -45,66 +56,100 @@ class MemoryCard(ctk.CTkFrame):
         self.btn.configure(image=icon, text=text, compound="top", 
                            fg_color=color, font=("Segoe UI", 12, "bold"), text_color=TEXT_DIM)
 
-    def load_image(self):
+    def load_image(self, priority=0):
         if not self.path: return
-        self.executor.submit(self._load_job, self.path)
+        # Cropping and the play icon are done by the shared loader, off the Tk thread
+        thumbnails.request(self, self.path, (max(50, self.card_width - 4), 196), self._apply_image, priority=priority)
 
-    def _load_job(self, target_path):
-        try:
-            if not os.path.exists(target_path):
-                self.after(0, lambda: self._set_placeholder_state(is_missing=True))
-                return
+    def _apply_image(self, ctk_img, status):
+        if ctk_img: self.btn.configure(image=ctk_img, text="", fg_color="transparent")
+        else: self._set_placeholder_state(is_missing=(status == "missing"))
 
-            ext = os.path.splitext(target_path)[1].lower()
-            pil_img = None
-            is_video = ext in ['.mp4', '.mov', '.avi']
-            
-            if is_video:
-                pil_img = extract_video_thumbnail(target_path)
-            else:
-                from utils.media_resolver import MediaResolver
-                pil_img = MediaResolver.get_display_image(target_path)
+class _MemoryRow(ctk.CTkFrame):
+    """One recycled list row: either a month header or a strip of cards."""
+    def __init__(self, parent, click_callback):
+        super().__init__(parent, fg_color="transparent", height=ROW_HEIGHT)
+        self.pack_propagate(False)
+        self.click_callback = click_callback
+        self.cards = []
+        self.tag = ctk.CTkFrame(self, fg_color=SNAP_RED, corner_radius=5)
+        self.lbl = ctk.CTkLabel(self.tag, text="", font=("Segoe UI", 12, "bold"), text_color="white")
+        self.lbl.pack(padx=10, pady=2)
+
+    def bind_header(self, text):
+        self.cancel_loads()
+        for card in self.cards: card.pack_forget()
+        self.configure(height=HEADER_HEIGHT)
+        self.lbl.configure(text=text)
+        self.tag.pack(anchor="w", padx=5, pady=(12, 0))
 
-            if pil_img and not self.is_destroyed:
-                pil_img.thumbnail((300, 300))
-                self.after(0, lambda: self._apply_image(pil_img, is_video))
+    def bind_cards(self, memories, card_width, priority):
+        self.tag.pack_forget()
+        self.configure(height=ROW_HEIGHT)
+        while len(self.cards) < len(memories): self.cards.append(MemoryCard(self, self.click_callback))
+        for i, card in enumerate(self.cards):
+            if i < len(memories):
+                card.bind(memories[i], card_width, priority)
+                card.pack(side="left", padx=2, pady=(2, 3))
             else:
-                self.after(0, lambda: self._set_placeholder_state(is_missing=False))
-        except:
-            self.after(0, lambda: self._set_placeholder_state(is_missing=True))
-
-    def _apply_image(self, pil_img, is_video):
-        if self.is_destroyed or not self.winfo_exists(): return
-        w = self.winfo_width()
-        if w < 50: w = 200
-        
-        try:
-            pil_img = ImageOps.fit(pil_img, (w, 200), method=Image.Resampling.LANCZOS)
-            if is_video: pil_img = add_play_icon(pil_img)
-            
-            ctk_img = ctk.CTkImage(light_image=pil_img, dark_image=pil_img, size=(w, 200))
-            self.btn.configure(image=ctk_img, text="", fg_color="transparent")
-        except:
-            self._set_placeholder_state(is_missing=False)
+                thumbnails.cancel(card)
+                card.pack_forget()
+
+    def cancel_loads(self):
+        for card in self.cards: thumbnails.cancel(card)
 
 class MemoriesView(ctk.CTkFrame):
+    """
+    Continuous memories grid. Rows are virtualized: month headers and card strips are
+    derived arithmetically from the month buckets and the column count, so only the
+    visible rows exist and resizing simply recomputes the row layout.
+    Dates are parsed once; type/year filters and the timeline bar work on the
+    precomputed facet histogram and per-type epoch arrays.
+    """
+    PREFETCH_ROWS = 3
+    CARD_MIN_WIDTH = 210
+    TYPES = {"All": None, "Photos": "photo", "Videos": "video"}
+
     def __init__(self, parent, memories_data):
         super().__init__(parent, fg_color="transparent")
-        self.memories = [m for m in memories_data if m.get('path') and os.path.exists(m['path'])]
-        
-        self.PAGE_SIZE = 40 # Slightly smaller for stability
-        self.current_page = 1
-        self.executor = ThreadPoolExecutor(max_workers=4)
-        
-        self._calculate_stats() 
+        self._index_memories(memories_data)
+        self.kind = None
+        self.year = None
+
+        self.cols = 1
+        self.card_width = 200
+        self.months = []
+        self.month_starts = []
+        self.row_starts = []
+        self.header_rows = set()
+
         self._setup_ui()
-        self.after(100, lambda: self.load_page(1))
+        self._apply_filter()
+
+    def _index_memories(self, memories_data):
+        # Existence comes from the loader's media scan; no filesystem calls here
+        ordered = [m for m in memories_data if m.get('exists')]
+        for m in ordered:
+            if m.get('epoch') is None: m['epoch'] = parse_epoch(m.get('date', '')) or 0
+        ordered.sort(key=lambda x: x['epoch'], reverse=True)
+        is_video = [m['path'].lower().endswith(VIDEO_EXTS) for m in ordered]
+        self.facets = FacetHistogram((m['epoch'] for m in ordered), is_video)
+        # Newest-first memory list and epoch index per type filter
+        self.by_type = {None: ordered,
+                        "photo": [m for m, v in zip(ordered, is_video) if not v],
+                        "video": [m for m, v in zip(ordered, is_video) if v]}
+        self.type_index = {k: DateIndex((m['epoch'] for m in v), descending=True) for k, v in self.by_type.items()}
+        self.memories = ordered
 
-    def _calculate_stats(self):
-        self.total_count = len(self.memories)
-        self.video_count = sum(1 for m in self.memories if m['path'].lower().endswith(('.mp4','.mov','.avi')))
-        self.photo_count = self.total_count - self.video_count
-        self.total_pages = math.ceil(self.total_count / self.PAGE_SIZE) if self.total_count > 0 else 1
+    def set_memories(self, memories_data):
+        """Rebinds the view to a freshly loaded memories list (after an import or reload)."""
+        self._index_memories(memories_data)
+        years = self.facets.years()
+        if self.year not in years:
+            self.year = None
+            self.year_var.set("All years")
+        self.year_menu.configure(values=["All years"] + [str(y) for y in reversed(years)])
+        self._apply_filter()
 
     def _setup_ui(self):
         top_bar = ctk.CTkFrame(self, fg_color=BG_SIDEBAR, height=60, corner_radius=0)
@@ -116,27 +161,36 @@ class MemoriesView(ctk.CTkFrame):
                           variable=self.sort_var, width=140, 
                           fg_color=BG_CARD, button_color=BG_HOVER, text_color=TEXT_MAIN,
                           command=self.on_sort_changed).pack(side="left", padx=5)
-        
-        self._add_stat(top_bar, f"{self.total_count}", TEXT_MAIN)
-        self._add_stat(top_bar, f"{self.photo_count}", SNAP_BLUE, "camera")
-        self._add_stat(top_bar, f"{self.video_count}", SNAP_RED, "video")
 
-        self.nav_frame = ctk.CTkFrame(top_bar, fg_color="transparent")
-        self.nav_frame.pack(side="right", padx=15)
-        
-        self.btn_prev = ctk.CTkButton(self.nav_frame, text="", image=assets.load_icon("chevron-left"), 
-                                      width=35, height=35, command=self.prev_page)
-        self.btn_prev.pack(side="left", padx=2)
-        
-        self.lbl_page = ctk.CTkLabel(self.nav_frame, text="", font=("Segoe UI", 12, "bold"), text_color=TEXT_MAIN)
-        self.lbl_page.pack(side="left", padx=10)
-        
-        self.btn_next = ctk.CTkButton(self.nav_frame, text="", image=assets.load_icon("chevron-right"), 
-                                      width=35, height=35, command=self.next_page)
-        self.btn_next.pack(side="left", padx=2)
+        self.year_var = ctk.StringVar(value="All years")
+        self.year_menu = ctk.CTkOptionMenu(top_bar, values=["All years"] + [str(y) for y in reversed(self.facets.years())],
+                                           variable=self.year_var, width=110,
+                                           fg_color=BG_CARD, button_color=BG_HOVER, text_color=TEXT_MAIN,
+                                           command=self.on_year_changed)
+        self.year_menu.pack(side="left", padx=5)
+        self.type_switch = ctk.CTkSegmentedButton(top_bar, values=list(self.TYPES), command=self.on_type_changed)
+        self.type_switch.set("All")
+        self.type_switch.pack(side="left", padx=5)
+
+        self.lbl_total = self._add_stat(top_bar, "", TEXT_MAIN)
+        self.lbl_photos = self._add_stat(top_bar, "", SNAP_BLUE, "camera")
+        self.lbl_videos = self._add_stat(top_bar, "", SNAP_RED, "video")
+
+        self.timeline = TimelineScrubber(self, on_select=self._on_timeline_select, height=44, fg_color=BG_SIDEBAR)
+        self.timeline.describe = self._describe_bucket
+        self.timeline.pack(fill="x", padx=10, pady=(4, 0))
 
-        self.scroll_mems = ctk.CTkScrollableFrame(self, fg_color="transparent")
-        self.scroll_mems.pack(fill="both", expand=True)
+        self.scroll_mems = VirtualList(self, create_row=lambda parent: _MemoryRow(parent, self.open_media),
+                                       bind_row=self._bind_row, unbind_row=lambda row: row.cancel_loads(),
+                                       estimate_height=self._row_height)
+        self.scroll_mems.pack(fill="both", expand=True, padx=(10, 0))
+        self.scroll_mems.on_range_changed = self._on_range
+        self.scroll_mems.canvas.bind("<Configure>", self._on_resize, add="+")
+
+        # Sticky copy of the current month's header, pinned over the top of the grid
+        self.sticky = ctk.CTkFrame(self.scroll_mems, fg_color=SNAP_RED, corner_radius=5)
+        self.lbl_sticky = ctk.CTkLabel(self.sticky, text="", font=("Segoe UI", 12, "bold"), text_color="white")
+        self.lbl_sticky.pack(padx=10, pady=2)
 
     def _add_stat(self, parent, text, color, icon_name=None):
         f = ctk.CTkFrame(parent, fg_color="transparent")
@@ -144,72 +198,151 @@ class MemoriesView(ctk.CTkFrame):
         if icon_name:
             icon = assets.load_icon(icon_name, size=(16, 16))
             if icon: ctk.CTkLabel(f, text="", image=icon).pack(side="left", padx=(0, 5))
-        ctk.CTkLabel(f, text=text, font=("Segoe UI", 12, "bold"), text_color=color).pack(side="left")
+        lbl = ctk.CTkLabel(f, text=text, font=("Segoe UI", 12, "bold"), text_color=color)
+        lbl.pack(side="left")
+        return lbl
 
-    def load_page(self, page_num):
-        self.current_page = page_num
-        self.lbl_page.configure(text=f"Page {self.current_page} / {self.total_pages}")
-        
-        # Clear existing content safely
-        for child in self.scroll_mems.winfo_children():
-            child.destroy()
-            
-        self.after(10, self._render_content)
-        self.scroll_mems._parent_canvas.yview_moveto(0.0)
-
-    def _render_content(self):
-        start = (self.current_page - 1) * self.PAGE_SIZE
-        chunk = self.memories[start : start + self.PAGE_SIZE]
-        if not chunk: return
-
-        # Dynamic grid calculation
-        canvas_width = self.scroll_mems.winfo_width() - 40
-        if canvas_width < 100: canvas_width = 1000
-        cols = max(1, canvas_width // 210)
-        card_width = int(canvas_width / cols) - 6
-
-        last_month = None
-        current_row = None
-        row_count = 0
-
-        for mem in chunk:
-            # Month Header logic
-            try:
-                dt = datetime.strptime(mem['date'], "%Y-%m-%d %H:%M:%S UTC")
-                month_key = dt.strftime("%B %Y").upper()
-            except: month_key = "UNKNOWN"
-
-            if month_key != last_month:
-                h_frame = ctk.CTkFrame(self.scroll_mems, fg_color="transparent", height=50)
-                h_frame.pack(fill="x", pady=(10, 0))
-                tag = ctk.CTkFrame(h_frame, fg_color=SNAP_RED, corner_radius=5)
-                tag.pack(anchor="w", padx=5)
-                ctk.CTkLabel(tag, text=month_key, font=("Segoe UI", 12, "bold"), text_color="white").pack(padx=10, pady=2)
-                last_month = month_key
-                current_row = None 
-
-            if current_row is None or row_count >= cols:
-                current_row = ctk.CTkFrame(self.scroll_mems, fg_color="transparent", height=205)
-                current_row.pack(fill="x", pady=2)
-                current_row.pack_propagate(False)
-                row_count = 0
-
-            card = MemoryCard(current_row, mem, card_width, self.open_media, self.executor)
-            card.pack(side="left", padx=2)
-            row_count += 1
+    # --- Filters ---
+
+    def _apply_filter(self):
+        """Selects the memories for the current type/year and rebuilds rows and timeline from the histogram."""
+        source, index = self.by_type[self.kind], self.type_index[self.kind]
+        if self.year is None: start, end = 0, len(source)
+        else: start, end = index.span(calendar.timegm((self.year, 1, 1, 0, 0, 0)),
+                                      calendar.timegm((self.year + 1, 1, 1, 0, 0, 0)))
+        descending = self.sort_var.get() == "Newest > Oldest"
+        self.memories = source[start:end] if descending else source[start:end][::-1]
+
+        self.months, first = [], 0
+        for (y, m), count in self.facets.buckets(self.kind, self.year, descending):
+            if not count: continue
+            self.months.append((y, m, count, first))
+            first += count
+        self.month_starts = [b[3] for b in self.months]
+
+        photos, videos = self.facets.counts(self.year)
+        if self.kind == "photo": videos = 0
+        elif self.kind == "video": photos = 0
+        self.lbl_total.configure(text=f"{photos + videos:,}")
+        self.lbl_photos.configure(text=f"{photos:,}")
+        self.lbl_videos.configure(text=f"{videos:,}")
+        self.timeline.set_buckets([(self._month_label(k), b[2]) for k, b in enumerate(self.months)])
+        self._build_layout()
+
+    def on_type_changed(self, choice):
+        self.kind = self.TYPES[choice]
+        self._apply_filter()
+
+    def on_year_changed(self, choice):
+        self.year = None if choice == "All years" else int(choice)
+        self._apply_filter()
 
     def on_sort_changed(self, choice):
-        self.memories.sort(key=lambda x: x['date'], reverse=(choice == "Newest > Oldest"))
-        self.load_page(1)
+        self._apply_filter()
+
+    def _describe_bucket(self, index):
+        y, m, _, _ = self.months[index]
+        photos, videos = self.facets.counts(y, m)
+        if self.kind == "photo": return f"{self._month_label(index)} · {photos:,} photos"
+        if self.kind == "video": return f"{self._month_label(index)} · {videos:,} videos"
+        return f"{self._month_label(index)} · {photos:,} photos · {videos:,} videos"
+
+    def _on_timeline_select(self, index):
+        self.scroll_mems.scroll_to(self.row_starts[index])
+
+    # --- Row geometry ---
+
+    def _columns(self):
+        width = self.scroll_mems.canvas.winfo_width()
+        if width < 100: width = 1000
+        cols = max(1, width // self.CARD_MIN_WIDTH)
+        return cols, int(width / cols) - 6
 
-    def prev_page(self):
-        if self.current_page > 1: self.load_page(self.current_page - 1)
+    def _build_layout(self):
+        """Month buckets -> row ranges. Each month takes one header row plus ceil(count / cols) card rows."""
+        self.cols, self.card_width = self._columns()
+        self.row_starts, rows = [], 0
+        for _, _, count, _ in self.months:
+            self.row_starts.append(rows)
+            rows += 1 + math.ceil(count / self.cols)
+        self.header_rows = set(self.row_starts)
+        self.sticky.place_forget()
+        self.scroll_mems.set_count(rows)
 
-    def next_page(self):
-        if self.current_page < self.total_pages: self.load_page(self.current_page + 1)
+    def _locate(self, row):
+        """(month bucket, first memory index or None for the header row, last memory index)."""
+        k = bisect_right(self.row_starts, row) - 1
+        local = row - self.row_starts[k]
+        _, _, count, first = self.months[k]
+        if local == 0: return k, None, None
+        start = first + (local - 1) * self.cols
+        return k, start, min(first + count, start + self.cols)
+
+    def _row_for_memory(self, index):
+        k = bisect_right(self.month_starts, index) - 1
+        return self.row_starts[k] + 1 + (index - self.months[k][3]) // self.cols
+
+    def _row_height(self, row):
+        return HEADER_HEIGHT if row in self.header_rows else ROW_HEIGHT
+
+    def _month_label(self, k):
+        year, month, _, _ = self.months[k]
+        return f"{MONTHS[month - 1].upper()} {year}"
+
+    def _bind_row(self, row, index):
+        k, start, end = self._locate(index)
+        if start is None: row.bind_header(self._month_label(k))
+        else:
+            first_visible = self.scroll_mems.anchor
+            row.bind_cards(self.memories[start:end], self.card_width, priority=max(0, index - first_visible))
+
+    def _on_range(self, first, last):
+        if not self.months: return
+        k, start, _ = self._locate(first)
+        # The real header is on screen at the top; otherwise pin a copy of it
+        if start is None and self.scroll_mems.offset == 0: self.sticky.place_forget()
+        else:
+            self.lbl_sticky.configure(text=self._month_label(k))
+            self.sticky.place(x=5, y=12)
+            self.sticky.lift()
+        self.timeline.set_marker(k)
+        self._prefetch_around(first, last)
+
+    def _prefetch_around(self, first, last):
+        thumbnails.cancel_prefetch()
+        for distance in range(1, self.PREFETCH_ROWS + 1):
+            for row in (last + distance, first - distance):
+                if not 0 <= row < self.scroll_mems.count: continue
+                _, start, end = self._locate(row)
+                if start is None: continue
+                for mem in self.memories[start:end]: thumbnails.prefetch(mem['path'], distance)
+
+    def _on_resize(self, event=None):
+        cols, card_width = self._columns()
+        if (cols, card_width) == (self.cols, self.card_width) or not self.months: return
+        # Keep the first visible memory in view across the reflow
+        k, start, _ = self._locate(self.scroll_mems.anchor)
+        header = start is None
+        self._build_layout()
+        self.scroll_mems.scroll_to(self.row_starts[k] if header else self._row_for_memory(start))
+
+    def jump_to_month(self, year, month=None):
+        """Scrolls to the header of that month (or year), or the closest one."""
+        if self.year is not None and self.year != year:
+            self.year_var.set("All years")
+            self.on_year_changed("All years")
+        if not self.months: return
+        descending = self.sort_var.get() == "Newest > Oldest"
+        prefix = (year, month or (12 if descending else 1))
+        for k, (y, m, _, _) in enumerate(self.months):
+            if ((y, m) <= prefix) if descending else ((y, m) >= prefix):
+                break
+        else:
+            k = len(self.months) - 1
+        self.scroll_mems.scroll_to(self.row_starts[k])
 
     def open_media(self, path):
         playlist = [m['path'] for m in self.memories]
         try: idx = playlist.index(path)
         except: idx = 0; playlist = [path]
-        GlobalMediaPlayer(self, playlist, idx)
\ No newline at end of file
+        GlobalMediaPlayer(self, playlist, idx)
@@ -1,12 +1,64 @@
 import customtkinter as ctk
+import calendar
 from datetime import datetime
 from ui.theme import *
 from utils.assets import assets
+from ui.components.virtual_list import VirtualList
+from database.places import PlaceIndex
+
+class FriendRow(ctk.CTkFrame):
+    """Recyclable friends-list row."""
+    def __init__(self, parent):
+        super().__init__(parent, fg_color="transparent")
+        self.card = ctk.CTkFrame(self, fg_color=BG_CARD, corner_radius=8)
+        self.card.pack(fill="x", padx=5, pady=2)
+        self.name_lbl = ctk.CTkLabel(self.card, text="", font=("Segoe UI", 13, "bold"), text_color=TEXT_MAIN)
+        self.name_lbl.pack(side="left", padx=15, pady=10)
+        self.user_lbl = ctk.CTkLabel(self.card, text="", font=("Segoe UI", 11), text_color=TEXT_DIM)
+        self.user_lbl.pack(side="right", padx=15)
+
+    def set_friend(self, friend, highlight=False):
+        self.name_lbl.configure(text=friend.get("Display Name", "Unknown"))
+        self.user_lbl.configure(text=f"@{friend.get('Username', '')}")
+        self.card.configure(fg_color=BG_HOVER if highlight else BG_CARD)
+
+class PlaceRow(ctk.CTkFrame):
+    """Recyclable travel-log row; clicking it lists the places near it."""
+    def __init__(self, parent, on_click):
+        super().__init__(parent, fg_color="transparent", cursor="hand2")
+        self.on_click = on_click
+        self.position = None
+        self.date_lbl = ctk.CTkLabel(self, text="", width=85, text_color=TEXT_DIM, font=("Segoe UI", 11, "bold"), fg_color=BG_CARD, corner_radius=6)
+        self.date_lbl.pack(side="left", padx=(5, 12), pady=4)
+        txt_frame = ctk.CTkFrame(self, fg_color="transparent")
+        txt_frame.pack(side="left", fill="x", expand=True)
+        self.place_lbl = ctk.CTkLabel(txt_frame, text="", text_color=TEXT_MAIN, anchor="w", font=("Segoe UI", 13, "bold"))
+        self.place_lbl.pack(fill="x")
+        self.loc_lbl = ctk.CTkLabel(txt_frame, text="", text_color=TEXT_DIM, anchor="w", font=("Segoe UI", 11))
+        self.loc_lbl.pack(fill="x")
+        for w in (self, self.date_lbl, txt_frame, self.place_lbl, self.loc_lbl):
+            w.bind("<Button-1>", lambda e: self.position is not None and self.on_click(self.position))
+
+    def set_place(self, place, position, distance=None):
+        self.position = position
+        self.date_lbl.configure(text=place.get("Date", "")[:10])
+        self.place_lbl.configure(text=place.get("Place", "Unknown"))
+        detail = place.get("Place Location", "")
+        if distance is not None: detail = f"{distance:.1f} km away  •  {detail}" if detail else f"{distance:.1f} km away"
+        self.loc_lbl.configure(text=detail)
 
 class ProfileView(ctk.CTkFrame):
-    def __init__(self, parent, profile_data):
+    def __init__(self, parent, profile_data, data_manager=None):
         super().__init__(parent, fg_color="transparent")
         self.profile = profile_data or {}
+        self.data_manager = data_manager
+        self.friends = sorted(self.profile.get("friends_list", []), key=lambda x: x.get("Display Name", "").lower())
+        self.shown_friends = self.friends
+        self.focused_username = None
+        self.filter_job = None
+        self.places = data_manager.get_place_index() if data_manager else PlaceIndex(self.profile.get("places", []))
+        self.shown_places = range(len(self.places))
+        self.place_distances = {}
         
         # Standardized gutter for perfect alignment
         self.GUTTER = 15 
@@ -61,7 +113,13 @@ class ProfileView(ctk.CTkFrame):
         # --- SECTION 3: DETAILED COLUMNS (BOTTOM) ---
         # 1. Friends Column
         self.col_friends = self._create_outer_column(0, f"Friends ({self.profile.get('stats', {}).get('friends', 0)})", "users")
-        self.friends_scroll = self._create_scroll_container(self.col_friends)
+        self.friend_filter = ctk.CTkEntry(self.col_friends, placeholder_text="Filter friends...", height=32,
+                                          fg_color=BG_MAIN, border_width=0, corner_radius=16)
+        self.friend_filter.pack(fill="x", padx=15, pady=(0, 8))
+        self.friend_filter.bind("<KeyRelease>", self._on_filter_key)
+        self.friends_scroll = VirtualList(self.col_friends, create_row=lambda parent: FriendRow(parent),
+                                          bind_row=self._bind_friend_row, estimate_height=lambda i: 48)
+        self.friends_scroll.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         self._populate_friends()
 
         # 2. History Column
@@ -76,8 +134,19 @@ class ProfileView(ctk.CTkFrame):
         self._populate_name_history()
 
         # 3. Travel Column
-        self.col_travel = self._create_outer_column(2, "Travel Log", "globe")
-        self.map_scroll = self._create_scroll_container(self.col_travel)
+        self.col_travel = self._create_outer_column(2, f"Travel Log ({len(self.places):,})", "globe")
+        travel_bar = ctk.CTkFrame(self.col_travel, fg_color="transparent")
+        travel_bar.pack(fill="x", padx=15, pady=(0, 8))
+        years = sorted({y for y, _, _, _ in self.places.dates.months()}, reverse=True) if len(self.places) else []
+        self.place_year = ctk.CTkOptionMenu(travel_bar, values=["All years"] + [str(y) for y in years], width=110,
+                                            command=lambda v: self._show_places_in_year(), fg_color=BG_CARD, button_color=BG_HOVER)
+        self.place_year.pack(side="left")
+        self.btn_all_places = ctk.CTkButton(travel_bar, text="Show all", width=80, fg_color=BG_CARD, hover_color=BG_HOVER,
+                                            text_color=TEXT_MAIN, command=self._reset_places)
+        self.travel_status = ctk.CTkLabel(self.col_travel, text="", text_color=TEXT_DIM, anchor="w", font=("Segoe UI", 11))
+        self.map_scroll = VirtualList(self.col_travel, create_row=lambda parent: PlaceRow(parent, self.show_places_near),
+                                      bind_row=self._bind_place_row, estimate_height=lambda i: 56)
+        self.map_scroll.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         self._populate_travel_log()
 
     def _create_outer_column(self, col, title, icon_name):
@@ -109,12 +178,45 @@ class ProfileView(ctk.CTkFrame):
         ctk.CTkLabel(f, text=title, font=("Segoe UI", 11, "bold"), text_color=TEXT_DIM).pack(pady=(0, 18))
 
     def _populate_friends(self):
-        friends = sorted(self.profile.get("friends_list", []), key=lambda x: x.get("Display Name", "").lower())
-        for i, f in enumerate(friends):
-            row = ctk.CTkFrame(self.friends_scroll, fg_color=BG_CARD, corner_radius=8)
-            row.grid(row=i, column=0, sticky="ew", padx=5, pady=2)
-            ctk.CTkLabel(row, text=f.get("Display Name", "Unknown"), font=("Segoe UI", 13, "bold"), text_color=TEXT_MAIN).pack(side="left", padx=15, pady=10)
-            ctk.CTkLabel(row, text=f"@{f.get('Username', '')}", font=("Segoe UI", 11), text_color=TEXT_DIM).pack(side="right", padx=15)
+        self.friends_scroll.set_count(len(self.shown_friends))
+
+    def _bind_friend_row(self, row, index):
+        f = self.shown_friends[index]
+        row.set_friend(f, highlight=(f.get("Username") == self.focused_username))
+
+    def _on_filter_key(self, event=None):
+        if self.filter_job: self.after_cancel(self.filter_job)
+        self.filter_job = self.after(150, self._apply_filter)
+
+    def _apply_filter(self):
+        self.filter_job = None
+        query = self.friend_filter.get().strip().lower()
+        if not query:
+            self.shown_friends = self.friends
+        else:
+            shown = [f for f in self.friends if query in f.get("Display Name", "").lower() or query in f.get("Username", "").lower()]
+            if self.data_manager and len(query) >= 3:
+                # Typo-tolerant matches from the shared quick-switcher index
+                by_user = {f.get("Username"): f for f in self.friends}
+                seen = {f.get("Username") for f in shown}
+                for hit in self.data_manager.get_quick_index().search(query, limit=50):
+                    username = hit.get("username") or hit.get("subtitle", "")[1:]
+                    if username in by_user and username not in seen:
+                        shown.append(by_user[username])
+                        seen.add(username)
+            self.shown_friends = shown
+        self._populate_friends()
+
+    def focus_friend(self, username):
+        """Clears the filter, scrolls the friends list to `username` and highlights it."""
+        self.friend_filter.delete(0, "end")
+        self.shown_friends = self.friends
+        self.focused_username = username
+        self._populate_friends()
+        for i, f in enumerate(self.friends):
+            if f.get("Username") == username:
+                self.friends_scroll.scroll_to(i)
+                break
 
     def _populate_device_history(self):
         for i, dev in enumerate(self.profile.get("device_history", [])):
@@ -131,13 +233,46 @@ class ProfileView(ctk.CTkFrame):
             ctk.CTkLabel(row, text=nc.get('Date', '')[:10], font=("Segoe UI", 11), text_color=TEXT_DIM).pack(side="right")
 
     def _populate_travel_log(self):
-        for i, p in enumerate(self.profile.get("places", [])):
-            row = ctk.CTkFrame(self.map_scroll, fg_color="transparent")
-            row.grid(row=i, column=0, sticky="ew", padx=5, pady=4)
-            date_lbl = ctk.CTkLabel(row, text=p.get("Date", "")[:10], width=85, text_color=TEXT_DIM, font=("Segoe UI", 11, "bold"), fg_color=BG_CARD, corner_radius=6)
-            date_lbl.pack(side="left", padx=(5, 12))
-            txt_frame = ctk.CTkFrame(row, fg_color="transparent")
-            txt_frame.pack(side="left", fill="x", expand=True)
-            ctk.CTkLabel(txt_frame, text=p.get("Place", "Unknown"), text_color=TEXT_MAIN, anchor="w", font=("Segoe UI", 13, "bold")).pack(fill="x")
-            if p.get("Place Location"): 
-                ctk.CTkLabel(txt_frame, text=p.get("Place Location"), text_color=TEXT_DIM, anchor="w", font=("Segoe UI", 11)).pack(fill="x")
\ No newline at end of file
+        self.map_scroll.set_count(len(self.shown_places))
+
+    def _bind_place_row(self, row, index):
+        pos = self.shown_places[index]
+        row.set_place(self.places.items[pos], pos, self.place_distances.get(pos))
+
+    def _set_travel_status(self, text):
+        if text:
+            self.travel_status.configure(text=text)
+            self.travel_status.pack(fill="x", padx=20, pady=(0, 6), before=self.map_scroll)
+        else: self.travel_status.pack_forget()
+
+    def _show_places_in_year(self):
+        value = self.place_year.get()
+        self.place_distances = {}
+        if value == "All years":
+            self.shown_places = range(len(self.places))
+            self._set_travel_status("")
+        else:
+            y = int(value)
+            self.shown_places = range(*self.places.between(calendar.timegm((y, 1, 1, 0, 0, 0)), calendar.timegm((y + 1, 1, 1, 0, 0, 0))))
+            self._set_travel_status(f"{len(self.shown_places):,} places in {y}")
+        self.btn_all_places.pack_forget()
+        self._populate_travel_log()
+
+    def _reset_places(self):
+        self.place_year.set("All years")
+        self._show_places_in_year()
+
+    def show_places_near(self, position, radius_km=25):
+        """Lists every place within radius_km of the place at `position`, closest first."""
+        loc = self.places.location(position)
+        if not loc: return
+        hits = self.places.near(loc[0], loc[1], radius_km)
+        self.place_distances = {pos: d for d, pos in hits}
+        self.shown_places = [pos for _, pos in hits]
+        status = f"{len(hits):,} places within {radius_km} km of {self.places.items[position].get('Place', 'this place')}"
+        if self.data_manager:
+            mems = self.data_manager.get_memory_place_index().near(loc[0], loc[1], radius_km)
+            if mems: status += f"  •  {len(mems):,} memories"
+        self._set_travel_status(status)
+        self.btn_all_places.pack(side="right")
+        self._populate_travel_log()
@@ -39,6 +39,7 @@ class SettingsView(ctk.CTkFrame):
         self._build_health_section(self.container, 1)
         self._build_locations_section(self.container, 2)
         self._build_maintenance_section(self.container, 3)
+        self._build_playback_section(self.container, 4)
 
     def _build_health_section(self, parent, row):
         card = ctk.CTkFrame(parent, fg_color=BG_CARD, corner_radius=10)
@@ -106,6 +107,47 @@ class SettingsView(ctk.CTkFrame):
         ctk.CTkLabel(card, text="🛡️ All data processing is strictly local. No data is sent to external servers.", 
                      font=("Segoe UI", 11), text_color="#2ECC71").grid(row=2, column=0, sticky="w", padx=15, pady=(5, 15))
 
+    def _build_playback_section(self, parent, row):
+        card = ctk.CTkFrame(parent, fg_color=BG_CARD, corner_radius=10)
+        card.grid(row=row, column=0, sticky="ew", padx=20, pady=10)
+        card.grid_columnconfigure(0, weight=1)
+        ctk.CTkLabel(card, text="Playback", font=("Segoe UI", 14, "bold"), text_color=SNAP_BLUE).grid(row=0, column=0, sticky="w", padx=15, pady=(15, 10))
+        self.playback_rows = ctk.CTkFrame(card, fg_color="transparent")
+        self.playback_rows.grid(row=1, column=0, sticky="ew", padx=15, pady=(0, 15))
+        decoders = {"Standard": "inprocess", "Isolated": "subprocess", "FFmpeg": "ffpyplayer"}
+        current = next((k for k, v in decoders.items() if v == self.cfg.get("video_decoder")), "Standard")
+        self._add_setting_option(self.playback_rows, "Video Decoder",
+                                 "Isolated runs in a helper process; FFmpeg decodes audio and scaled video in one pass",
+                                 list(decoders), current, lambda label: self.cfg.set("video_decoder", decoders[label]))
+        self._add_setting_switch(self.playback_rows, "Playback Proxies",
+                                 "Play cached 720p copies of large videos (build them in Tools)",
+                                 bool(self.cfg.get("use_proxies")),
+                                 lambda on: self.cfg.set("use_proxies", on))
+
+    def _setting_row(self, parent, label, detail):
+        row = ctk.CTkFrame(parent, fg_color=BG_MAIN, corner_radius=8)
+        row.pack(fill="x", pady=4)
+        text_col = ctk.CTkFrame(row, fg_color="transparent")
+        text_col.pack(side="left", fill="x", expand=True, padx=15, pady=8)
+        ctk.CTkLabel(text_col, text=label, font=("Segoe UI", 11, "bold"), text_color=TEXT_MAIN, anchor="w").pack(fill="x")
+        ctk.CTkLabel(text_col, text=detail, font=("Segoe UI", 10), text_color=TEXT_DIM, anchor="w").pack(fill="x")
+        return row
+
+    def _add_setting_option(self, parent, label, detail, values, current, on_change):
+        row = self._setting_row(parent, label, detail)
+        options = ctk.CTkSegmentedButton(row, values=values, command=on_change, width=240)
+        options.set(current)
+        options.pack(side="right", padx=15)
+        return options
+
+    def _add_setting_switch(self, parent, label, detail, value, on_toggle):
+        row = self._setting_row(parent, label, detail)
+        switch = ctk.CTkSwitch(row, text="", width=50, progress_color=SNAP_BLUE)
+        if value: switch.select()
+        switch.configure(command=lambda: on_toggle(bool(switch.get())))
+        switch.pack(side="right", padx=15)
+        return switch
+
     def _add_clickable_path(self, parent, label, path, detail):
         row = ctk.CTkFrame(parent, fg_color="transparent")
         row.pack(fill="x", pady=4)
@@ -1,7 +1,19 @@
 import customtkinter as ctk
 import os
+import threading
+import calendar
+import time
+from tkinter import filedialog
 from ui.theme import *
 from utils.assets import assets
+from utils.proxy_manager import proxies, VIDEO_EXTS
+from utils.audio_waveform import waveforms
+from utils.duplicate_finder import duplicates
+from utils.dedup_storage import dedup
+from utils.batch_export import exporter
+from ui.components.duplicates_panel import DuplicatesPanel
+from ui.components.media_viewer import GlobalMediaPlayer
+from utils.ui_dispatcher import dispatcher
 
 class ToolsView(ctk.CTkFrame):
     def __init__(self, parent, config_manager, data_manager):
@@ -10,7 +22,12 @@ class ToolsView(ctk.CTkFrame):
         self.data_manager = data_manager
         self.is_processing = False
         self.selected_tool_cmd = None
+        self.tools = {}
+        self.active_tool = None
+        self.duplicates_panel = None
+        self.export_options = None
         self._setup_ui()
+        self._register_tools()
 
     def _setup_ui(self):
         self.grid_columnconfigure(1, weight=1)
@@ -27,7 +44,7 @@ class ToolsView(ctk.CTkFrame):
         self.tools_container = ctk.CTkScrollableFrame(self.sidebar, fg_color="transparent")
         self.tools_container.pack(fill="both", expand=True, padx=5, pady=5)
 
-        # No tools added here for now - list remains empty but layout is preserved
+        # Tools are registered in _register_tools
 
         # --- RIGHT CONTENT: TERMINAL & ACTIONS ---
         self.main_content = ctk.CTkFrame(self, fg_color=BG_SIDEBAR, corner_radius=15)
@@ -58,9 +75,194 @@ class ToolsView(ctk.CTkFrame):
         self.btn_container.pack(fill="x")
 
         self.btn_run = ctk.CTkButton(self.btn_container, text="Run Tool", fg_color=SNAP_BLUE, 
-                                     hover_color="#007ACC", height=40, font=("Segoe UI", 13, "bold"))
+                                     hover_color="#007ACC", height=40, font=("Segoe UI", 13, "bold"),
+                                     command=self.run_selected_tool)
         # Hidden initially until a tool is selected
 
+    def _register_tools(self):
+        self._add_tool("playback_proxies", "Playback Proxies", "video", self._run_playback_proxies)
+        self._add_tool("audio_waveforms", "Audio Waveforms", "music", self._run_audio_waveforms)
+        self._add_tool("duplicate_finder", "Duplicate Finder", "shuffle", self._run_duplicate_finder)
+        self._add_tool("storage_dedup", "Storage Dedup", "save", self._run_storage_dedup)
+        self._add_tool("batch_export", "Batch Export", "external-link", self._run_batch_export, prepare=self._prepare_batch_export)
+
+    def _add_tool(self, tool_id, title, icon_name, run_fn, prepare=None):
+        """prepare() runs on the UI thread before run_fn; its result is passed to run_fn, None cancels the run."""
+        btn = ctk.CTkButton(self.tools_container, text=f" {title}", image=assets.load_icon(icon_name, size=(18, 18)),
+                            compound="left", anchor="w", height=40, corner_radius=8,
+                            fg_color="transparent", hover_color=BG_HOVER, text_color=TEXT_MAIN,
+                            font=("Segoe UI", 13, "bold"), command=lambda: self.select_tool(tool_id))
+        btn.pack(fill="x", padx=5, pady=2)
+        self.tools[tool_id] = {"title": title, "run": run_fn, "prepare": prepare, "button": btn}
+
+    def select_tool(self, tool_id):
+        if self.is_processing: return
+        for tid, tool in self.tools.items():
+            tool["button"].configure(fg_color=BG_CARD if tid == tool_id else "transparent")
+        self.active_tool = tool_id
+        self.lbl_active_tool.configure(text=self.tools[tool_id]["title"])
+        self.progress.set(0)
+        self.clear_log()
+        self._show_terminal()
+        self._show_export_options(tool_id == "batch_export")
+        self._show_tool_doc(tool_id)
+        self.btn_run.pack(fill="x")
+
+    def _show_tool_doc(self, tool_id):
+        path = assets.get_tool_doc(tool_id)
+        if not os.path.exists(path): return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip().lstrip("#").strip().replace("**", "")
+                if line: self.log(line)
+
+    def run_selected_tool(self):
+        if self.is_processing or not self.active_tool: return
+        tool = self.tools[self.active_tool]
+        args = ()
+        if tool["prepare"]:
+            prepared = tool["prepare"]()
+            if prepared is None: return
+            args = (prepared,)
+        self.is_processing = True
+        self.btn_run.configure(state="disabled", text="Running...")
+        self.progress.set(0)
+        threading.Thread(target=self._run_tool_thread, args=(tool["run"], args), daemon=True).start()
+
+    def _run_tool_thread(self, run_fn, args=()):
+        try:
+            run_fn(*args)
+        except Exception as e:
+            self.log_async(f"Error: {e}")
+        finally:
+            dispatcher.post(self._finish_tool)
+
+    def _finish_tool(self):
+        self.is_processing = False
+        self.btn_run.configure(state="normal", text="Run Tool")
+
+    def log_async(self, message):
+        dispatcher.post(self.log, message)
+
+    def progress_async(self, value):
+        dispatcher.post_latest((id(self), "progress"), self.progress.set, value)
+
+    def clear_log(self):
+        self.terminal.configure(state="normal")
+        self.terminal.delete("1.0", "end")
+        self.terminal.configure(state="disabled")
+
+    def _all_video_paths(self):
+        paths = {m.get("path") for m in self.data_manager.memories}
+        paths.update(self.data_manager.media_map.values())
+        return [p for p in paths if p and p.lower().endswith(VIDEO_EXTS)]
+
+    def _run_playback_proxies(self):
+        videos = self._all_video_paths()
+        self.log_async(f"Inspecting {len(videos)} videos...")
+        proxies.generate_all(videos, self.log_async, self.progress_async)
+
+    def _run_audio_waveforms(self):
+        paths = set(self.data_manager.media_map.values())
+        paths.update(m.get("path") for m in self.data_manager.memories)
+        self.log_async("Analyzing audio notes...")
+        waveforms.analyze_all(paths, self.log_async, self.progress_async)
+
+    def _run_duplicate_finder(self):
+        paths = self.data_manager.media_paths()
+        self.log_async(f"Fingerprinting {len(paths)} files...")
+        duplicates.scan(paths, self.log_async, self.progress_async)
+        clusters = self.data_manager.find_duplicates()
+        extra = sum(len(c) - 1 for c in clusters)
+        self.log_async(f"Done. {len(clusters)} duplicate groups, {extra} redundant copies.")
+        if clusters: dispatcher.post(self._show_duplicates, clusters)
+
+    def _run_storage_dedup(self):
+        root = self.cfg.get("data_root")
+        if not root or not os.path.isdir(root):
+            self.log_async("No data folder configured.")
+            return
+        roots = [root]
+        mem_path = self.cfg.get("memories_path")
+        if mem_path and os.path.isdir(mem_path) and not os.path.abspath(mem_path).startswith(os.path.abspath(root)):
+            roots.append(mem_path)
+        self.log_async("Scanning media folders...")
+        dedup.run(roots, self.log_async, self.progress_async)
+
+    def _show_export_options(self, show):
+        if not show:
+            if self.export_options: self.export_options.pack_forget()
+            return
+        if not self.export_options: self._build_export_options()
+        # Conversations may have been (re)loaded since the options were built
+        self.export_chat.configure(values=["All conversations"] + list(self.data_manager.chat_index))
+        self.export_options.pack(fill="x", pady=(0, 10), before=self.progress)
+
+    def _build_export_options(self):
+        frame = self.export_options = ctk.CTkFrame(self.action_frame, fg_color="transparent")
+        row1 = ctk.CTkFrame(frame, fg_color="transparent")
+        row1.pack(fill="x", pady=(0, 6))
+        self.export_from = ctk.CTkEntry(row1, placeholder_text="From YYYY-MM-DD", width=130)
+        self.export_from.pack(side="left", padx=(0, 6))
+        self.export_to = ctk.CTkEntry(row1, placeholder_text="To YYYY-MM-DD", width=130)
+        self.export_to.pack(side="left", padx=(0, 12))
+        self.export_type = ctk.CTkSegmentedButton(row1, values=["All", "Photos", "Videos", "Audio"])
+        self.export_type.set("All")
+        self.export_type.pack(side="left", padx=(0, 12))
+        self.export_mode = ctk.CTkSegmentedButton(row1, values=["Copy", "Hardlink"])
+        self.export_mode.set("Copy")
+        self.export_mode.pack(side="left")
+
+        row2 = ctk.CTkFrame(frame, fg_color="transparent")
+        row2.pack(fill="x")
+        self.export_source = ctk.CTkSegmentedButton(row2, values=["Memories", "Chat Media", "Both"])
+        self.export_source.set("Memories")
+        self.export_source.pack(side="left", padx=(0, 12))
+        self.export_chat = ctk.CTkOptionMenu(row2, values=["All conversations"], width=200, fg_color=BG_CARD, button_color=BG_HOVER)
+        self.export_chat.pack(side="left")
+
+    def _parse_export_day(self, entry, label):
+        text = entry.get().strip()
+        if not text: return None, True
+        try: return calendar.timegm(time.strptime(text, "%Y-%m-%d")), True
+        except ValueError:
+            self.log(f"{label} date must be YYYY-MM-DD.")
+            return None, False
+
+    def _prepare_batch_export(self):
+        start, ok_start = self._parse_export_day(self.export_from, "From")
+        end, ok_end = self._parse_export_day(self.export_to, "To")
+        if not (ok_start and ok_end): return None
+        if end is not None: end += 86400   # the To day is included
+        dest = filedialog.askdirectory(title="Select Export Folder")
+        if not dest: return None
+        kinds = {"Photos": {"photo"}, "Videos": {"video"}, "Audio": {"audio"}}.get(self.export_type.get())
+        source, chat = self.export_source.get(), self.export_chat.get()
+        return {"start": start, "end": end, "kinds": kinds, "dest": dest,
+                "hardlink": self.export_mode.get() == "Hardlink",
+                "memories": source != "Chat Media",
+                "chats": [] if source == "Memories" or chat == "All conversations" else [chat],
+                "all_chats": source != "Memories" and chat == "All conversations"}
+
+    def _run_batch_export(self, opts):
+        items = exporter.select(self.data_manager, opts["start"], opts["end"], opts["kinds"],
+                                memories=opts["memories"], chats=opts["chats"], all_chats=opts["all_chats"])
+        if not items:
+            self.log_async("Nothing matches the selected filters.")
+            return
+        exporter.run(items, opts["dest"], self.log_async, self.progress_async, hardlink=opts["hardlink"])
+
+    def _show_duplicates(self, clusters):
+        if not self.duplicates_panel:
+            self.duplicates_panel = DuplicatesPanel(self.main_content, on_open=lambda paths, i: GlobalMediaPlayer(self, paths, i))
+        self.terminal.grid_remove()
+        self.duplicates_panel.grid(row=1, column=0, sticky="nsew", padx=20, pady=10)
+        self.duplicates_panel.set_clusters(clusters)
+
+    def _show_terminal(self):
+        if self.duplicates_panel: self.duplicates_panel.grid_remove()
+        self.terminal.grid()
+
     def log(self, message):
         self.terminal.configure(state="normal")
         self.terminal.insert("end", f"\n> {message}")
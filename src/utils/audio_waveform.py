@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import deque
+import subprocess
+from utils.repair import EnvironmentManager
+from utils.ui_dispatcher import dispatcher
+
+AUDIO_EXTS = ('.mp3', '.wav', '.m4a')
+
+class WaveformStore:
+    """
+    Duration and a downsampled peak waveform per audio note, persisted in the archive index.
+    Each file is decoded once (ffmpeg to 8 kHz mono PCM); afterwards players draw from the
+    stored int8 peaks without opening the media. Unknown files are analyzed by one
+    background worker for the players currently showing them (only if ffmpeg is already
+    installed), or in bulk from the Tools view.
+    """
+    _instance = None
+    SAMPLES = 240
+    RATE = 8000
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(WaveformStore, cls).__new__(cls)
+            cls._instance.index = None
+            cls._instance.stat = None
+            cls._instance._memory = {}
+            cls._instance._wanted = {}      # owner -> (path, callback)
+            cls._instance._todo = deque()
+            cls._instance._queued = set()
+            cls._instance._lock = threading.Lock()
+            cls._instance._worker = None
+        return cls._instance
+
+    def attach(self, archive_index, stat=None):
+        """stat(path) -> (size, mtime) or None; defaults to os.stat, the loader passes its scan results."""
+        self.index = archive_index
+        self.stat = stat
+        self._memory = {}
+
+    def _file_stat(self, path):
+        if self.stat: return self.stat(path)
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime
+        except OSError: return None
+
+    def get(self, path):
+        """(duration, peaks) if known, else None. Only touches the index, never the media."""
+        if path in self._memory: return self._memory[path]
+        if not self.index: return None
+        st = self._file_stat(path)
+        if not st: return None
+        meta = self.index.get_audio_meta(path, *st)
+        if meta:
+            self._memory[path] = (meta[0], peaks_from_bytes(meta[1]))
+            return self._memory[path]
+        return None
+
+    def request(self, path, callback, owner=None):
+        """
+        Queues analysis for `path`; callback(duration, peaks) runs on the Tk thread when done.
+        `owner` (e.g. the player widget) replaces its earlier request; see cancel().
+        """
+        owner = owner if owner is not None else callback
+        with self._lock:
+            self._wanted[owner] = (path, callback)
+            if path not in self._queued:
+                self._queued.add(path)
+                self._todo.append(path)
+            # Worker exit and start are both decided under the lock, so no request is stranded
+            if not self._worker:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def cancel(self, owner):
+        """Drops the owner's pending request; paths nobody waits for are skipped by the worker."""
+        with self._lock: self._wanted.pop(owner, None)
+
+    def _run(self):
+        # Never downloads ffmpeg from here; without it, waveforms come from the Tools job
+        ffmpeg = EnvironmentManager.find_ffmpeg()
+        while True:
+            with self._lock:
+                if not self._todo:
+                    self._worker = None
+                    return
+                path = self._todo.popleft()
+                self._queued.discard(path)
+                wanted = any(p == path for p, _ in self._wanted.values())
+            result = self.analyze(path, ffmpeg) if wanted and ffmpeg else None
+            with self._lock:
+                owners = [(o, cb) for o, (p, cb) in self._wanted.items() if p == path]
+                for o, _ in owners: del self._wanted[o]
+            if result:
+                for _, callback in owners: dispatcher.post(callback, *result)
+
+    def analyze(self, path, ffmpeg):
+        """Decodes once and stores the result. Returns (duration, peaks) or None."""
+        cached = self.get(path)
+        if cached: return cached
+        try:
+            import numpy as np
+            st = self._file_stat(path) or (0, 0)
+            cmd = [ffmpeg, "-v", "error", "-i", path, "-vn", "-ac", "1", "-ar", str(self.RATE), "-f", "s16le", "-"]
+            out = subprocess.run(cmd, capture_output=True, timeout=120,
+                                 creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0).stdout
+            pcm = np.frombuffer(out, dtype=np.int16)
+            if not len(pcm): return None
+            duration = len(pcm) / self.RATE
+            # Peak per bucket, scaled so the loudest bucket is 127
+            buckets = np.array_split(np.abs(pcm.astype(np.int32)), min(self.SAMPLES, len(pcm)))
+            peaks = np.array([b.max() for b in buckets], dtype=np.float32)
+            peaks = (peaks / max(1.0, float(peaks.max())) * 127).astype(np.int8)
+            if self.index: self.index.save_audio_meta(path, st[0], st[1], duration, peaks.tobytes())
+            self._memory[path] = (duration, list(peaks))
+            return self._memory[path]
+        except Exception as e:
+            print(f"[ERROR] Waveform analysis failed for {os.path.basename(path)}: {e}")
+            return None
+
+    def analyze_all(self, paths, log, progress, is_cancelled=lambda: False):
+        """Tools job: analyzes every audio note that has no stored waveform yet."""
+        ffmpeg = EnvironmentManager.get_ffmpeg()
+        paths = sorted({p for p in paths if p and p.lower().endswith(AUDIO_EXTS) and self._file_stat(p)})
+        done, skipped, failed = 0, 0, 0
+        for i, path in enumerate(paths):
+            if is_cancelled(): break
+            if self.get(path): skipped += 1
+            elif self.analyze(path, ffmpeg): done += 1
+            else: failed += 1
+            progress((i + 1) / len(paths))
+        log(f"Done. {done} analyzed, {skipped} already cached, {failed} failed.")
+
+def peaks_from_bytes(data):
+    return [b - 256 if b > 127 else b for b in data]
+
+waveforms = WaveformStore()
@@ -0,0 +1,181 @@
+import os
+import time
+import shutil
+import concurrent.futures
+from PIL import Image
+from database.timeline import parse_epoch
+
+VIDEO_EXTS = ('.mp4', '.mov', '.avi')
+AUDIO_EXTS = ('.mp3', '.wav', '.m4a')
+JPEG_EXTS = ('.jpg', '.jpeg')
+
+def media_kind(path):
+    ext = os.path.splitext(path)[1].lower()
+    return "video" if ext in VIDEO_EXTS else "audio" if ext in AUDIO_EXTS else "photo"
+
+def exif_segment(src, epoch):
+    """
+    APP1 segment for `src` with DateTimeOriginal set to `epoch` (UTC). Existing EXIF tags
+    are kept; Pillow only reads the header here, the image data is never decoded.
+    """
+    with Image.open(src) as img: exif = img.getexif()
+    stamp = time.strftime("%Y:%m:%d %H:%M:%S", time.gmtime(epoch))
+    exif_ifd = exif.get_ifd(0x8769)
+    exif_ifd[0x9003] = stamp        # DateTimeOriginal
+    exif_ifd[0x9004] = stamp        # DateTimeDigitized
+    exif_ifd[0x9011] = "+00:00"     # OffsetTimeOriginal
+    data = exif.tobytes()
+    if len(data) + 2 > 0xFFFF: return None
+    return b"\xff\xe1" + (len(data) + 2).to_bytes(2, "big") + data
+
+def _jpeg_header(f):
+    """(SOI, [APPn/COM segments]) read from the start of `f`, which is left at the first other marker."""
+    head = f.read(2)
+    if head != b"\xff\xd8": raise ValueError("not a JPEG")
+    segments = []
+    while True:
+        marker = f.read(4)
+        if len(marker) < 4 or marker[0] != 0xFF: raise ValueError("broken JPEG header")
+        code, length = marker[1], int.from_bytes(marker[2:4], "big")
+        # Only APPn/COM segments are walked; anything else starts the image proper
+        if not (0xE0 <= code <= 0xEF or code == 0xFE):
+            f.seek(-4, os.SEEK_CUR)
+            return head, segments
+        segments.append(marker + f.read(length - 2))
+
+def copy_jpeg_with_exif(src, dst, segment):
+    """
+    Copies a JPEG, swapping its EXIF APP1 segment for `segment`. Only the marker
+    segments before the image data are rewritten; the compressed data is streamed as is.
+    """
+    with open(src, "rb") as f:
+        head, segments = _jpeg_header(f)
+        kept = [seg for seg in segments if not (seg[1] == 0xE1 and seg[4:10] == b"Exif\x00\x00")]
+        with open(dst, "wb") as out:
+            out.write(head)
+            # JFIF (APP0) must stay first; EXIF follows it
+            app0 = [s for s in kept if s[1] == 0xE0]
+            out.write(b"".join(app0) + segment + b"".join(s for s in kept if s[1] != 0xE0))
+            shutil.copyfileobj(f, out, 1024 * 1024)
+
+class BatchExporter:
+    """
+    Bulk export of memories and chat media with their capture dates restored.
+    Items are selected by date range, media type and conversation; files are copied
+    (or hardlinked) by a thread pool, copies get their mtime set with os.utime and JPEG
+    copies get EXIF DateTimeOriginal without re-encoding.
+    """
+    _instance = None
+    WORKERS = 8
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(BatchExporter, cls).__new__(cls)
+        return cls._instance
+
+    def select(self, data_manager, start=None, end=None, kinds=None, memories=True, chats=(), all_chats=False):
+        """
+        [(path, epoch, subfolder)] to export. start/end are epochs (end exclusive), kinds a set of
+        photo/video/audio, chats a list of conversation keys (or all_chats for every conversation).
+        """
+        def wanted(path, epoch):
+            if not path or epoch is None: return False
+            if start is not None and epoch < start: return False
+            if end is not None and epoch >= end: return False
+            return not kinds or media_kind(path) in kinds
+
+        items = []
+        if memories:
+            for m in data_manager.memories:
+                if m.get("exists") and wanted(m["path"], m.get("epoch")): items.append((m["path"], m["epoch"], "Memories"))
+        for chat in (data_manager.chat_index if all_chats else chats):
+            for media in data_manager.get_chat_media(chat):
+                epoch = parse_epoch(media["date"])
+                if wanted(media["path"], epoch): items.append((media["path"], epoch, os.path.join("Chats", chat)))
+        items.sort(key=lambda item: item[1])
+        return items
+
+    def run(self, items, dest, log, progress, hardlink=False, is_cancelled=lambda: False):
+        # Names are assigned up front so the workers never race on collisions. Files already
+        # in `dest` are never overwritten: earlier exports of the same item are skipped and
+        # other files just take up their name.
+        jobs, taken, skipped = [], set(), 0
+        for src, epoch, folder in items:
+            stem = time.strftime("%Y-%m-%d_%H-%M-%S", time.gmtime(epoch))
+            ext = os.path.splitext(src)[1].lower()
+            name, n = f"{stem}{ext}", 1
+            while True:
+                dst = os.path.join(dest, folder, name)
+                if (folder, name) not in taken:
+                    if not os.path.lexists(dst): break
+                    if self._is_export_of(src, dst, epoch):
+                        dst = None
+                        break
+                n += 1
+                name = f"{stem}_{n}{ext}"
+            taken.add((folder, name))
+            if dst: jobs.append((src, dst, epoch))
+            else: skipped += 1
+        for folder in {f for _, _, f in items}: os.makedirs(os.path.join(dest, folder), exist_ok=True)
+
+        if skipped: log(f"{skipped} files were already exported and are skipped.")
+        if not jobs:
+            progress(1.0)
+            return
+        log(f"Exporting {len(jobs)} files to {dest} ({'hardlinks' if hardlink else 'copies'})...")
+        started, done, total_bytes, failed = time.perf_counter(), 0, 0, 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            futures = [pool.submit(self._export_one, src, dst, epoch, hardlink) for src, dst, epoch in jobs]
+            for future in concurrent.futures.as_completed(futures):
+                if is_cancelled():
+                    for f in futures: f.cancel()
+                    break
+                try: total_bytes += future.result()
+                except Exception as e:
+                    failed += 1
+                    if failed <= 20: log(f"Failed: {e}")
+                done += 1
+                progress(done / len(jobs))
+        elapsed = max(1e-6, time.perf_counter() - started)
+        log(f"Done. {done - failed} files, {total_bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+            f"({(done - failed) / elapsed:.0f} files/s, {total_bytes / 1e6 / elapsed:.1f} MB/s), {failed} failed.")
+
+    @staticmethod
+    def _is_export_of(src, dst, epoch):
+        """True if `dst` is an earlier export of `src`: the same file (hardlink) or a dated copy of it."""
+        try:
+            if os.path.samefile(src, dst): return True
+            s, d = os.stat(src), os.stat(dst)
+            if int(d.st_mtime) != int(epoch): return False
+            if not src.lower().endswith(JPEG_EXTS): return s.st_size == d.st_size
+            # JPEG copies differ only in their APPn header; the data after it is copied verbatim
+            with open(src, "rb") as f: header = len(b"".join(_jpeg_header(f)[1])) + 2
+            tail = min(s.st_size - header, d.st_size, 64 * 1024)
+            if tail <= 0: return False
+            with open(src, "rb") as a, open(dst, "rb") as b:
+                a.seek(-tail, os.SEEK_END)
+                b.seek(-tail, os.SEEK_END)
+                return a.read() == b.read()
+        except (OSError, ValueError): return False
+
+    def _export_one(self, src, dst, epoch, hardlink):
+        if hardlink:
+            # A hardlink shares the archive file, so neither its bytes nor its mtime are touched
+            try:
+                os.link(src, dst)
+                return os.path.getsize(dst)
+            except FileExistsError: raise
+            except OSError: shutil.copyfile(src, dst)
+        elif src.lower().endswith(JPEG_EXTS):
+            try:
+                segment = exif_segment(src, epoch)
+                if segment: copy_jpeg_with_exif(src, dst, segment)
+                else: shutil.copyfile(src, dst)
+            except (OSError, ValueError, SyntaxError):
+                shutil.copyfile(src, dst)
+        else:
+            shutil.copyfile(src, dst)
+        os.utime(dst, (epoch, epoch))
+        return os.path.getsize(dst)
+
+exporter = BatchExporter()
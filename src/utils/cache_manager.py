@@ -1,4 +1,5 @@
 import os
+import json
 import hashlib
 from PIL import Image
 from pathlib import Path
@@ -42,9 +43,29 @@ class ThumbnailCache:
         except Exception as e:
             print(f"[ERROR] Cache save failed: {e}")
 
-    def _get_path(self, video_path):
+    def get_meta(self, media_path, kind):
+        """Loads a small JSON sidecar (e.g. keyframe index) stored next to the thumbnail."""
+        if not self.initialized: return None
+        meta_path = self._get_path(media_path, f".{kind}.json")
+        if meta_path.exists():
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except:
+                return None
+        return None
+
+    def save_meta(self, media_path, kind, data):
+        if not self.initialized or data is None: return
+        try:
+            with open(self._get_path(media_path, f".{kind}.json"), "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except Exception as e:
+            print(f"[ERROR] Cache meta save failed: {e}")
+
+    def _get_path(self, video_path, suffix=".jpg"):
         norm_path = os.path.normpath(os.path.abspath(video_path))
         h = hashlib.md5(norm_path.encode('utf-8')).hexdigest()
-        return self.cache_dir / f"{h}.jpg"
+        return self.cache_dir / f"{h}{suffix}"
 
 cache = ThumbnailCache()
\ No newline at end of file
@@ -12,7 +12,10 @@ class ConfigManager:
         self.default_config = {
             "data_root": "",
             "memories_path": "",
-            "appearance_mode": "System"
+            "appearance_mode": "System",
+            "video_decoder": "inprocess",
+            "use_proxies": True,
+            "memory_link_tolerance": 2
         }
         self.config = self.default_config.copy()
         self.load_config()
@@ -37,5 +40,10 @@ class ConfigManager:
         with open(self.config_file, "w") as f:
             json.dump(self.config, f, indent=4)
 
+    def set(self, key, value):
+        self.config[key] = value
+        with open(self.config_file, "w") as f:
+            json.dump(self.config, f, indent=4)
+
     def get(self, key):
         return self.config.get(key, self.default_config.get(key, ""))
\ No newline at end of file
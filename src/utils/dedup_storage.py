@@ -0,0 +1,165 @@
+import os
+import sys
+import json
+import mmap
+import time
+import hashlib
+import concurrent.futures
+
+MEDIA_EXTS = ('.jpg', '.jpeg', '.png', '.webp', '.mp4', '.mov', '.avi', '.mp3', '.wav', '.m4a')
+FICLONE = 0x40049409    # Linux ioctl: share extents between two files (btrfs, xfs)
+
+class StorageDeduplicator:
+    """
+    Finds byte-identical media files under the data root (chat_media, memories and repeated
+    extractions) and stores each content only once. Files are hashed in parallel
+    (BLAKE2b over an mmap, the hash releases the GIL); hashes are kept in the archive index
+    so a re-run only hashes new or changed files. Only files whose size occurs more than
+    once are hashed at all. Duplicates become reflinks where the filesystem supports them,
+    otherwise hardlinks; every path keeps its own modification time, and files that can be
+    linked neither way are listed in the manifest.
+    """
+    _instance = None
+    WORKERS = 4
+    CHUNK = 8 * 1024 * 1024
+    MANIFEST = "dedup_manifest.json"
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StorageDeduplicator, cls).__new__(cls)
+            cls._instance.index = None
+        return cls._instance
+
+    def attach(self, archive_index):
+        self.index = archive_index
+
+    def hash_file(self, path):
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0: return h.hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                view = memoryview(m)
+                try:
+                    for start in range(0, len(m), self.CHUNK): h.update(view[start:start + self.CHUNK])
+                finally: view.release()
+        return h.hexdigest()
+
+    def collect(self, roots):
+        """{path: (size, mtime, inode key)} for every media file below the given folders."""
+        files = {}
+        for dirpath, dirnames, filenames in (w for root in roots for w in os.walk(root)):
+            dirnames[:] = [d for d in dirnames if d not in ("cache", "repair_backups")]
+            for name in filenames:
+                if not name.lower().endswith(MEDIA_EXTS): continue
+                path = os.path.join(dirpath, name)
+                try: st = os.stat(path)
+                except OSError: continue
+                files[path] = (st.st_size, st.st_mtime, (st.st_dev, st.st_ino))
+        return files
+
+    def run(self, roots, log, progress, is_cancelled=lambda: False):
+        """Dedups media below `roots`; the manifest is written to the first root."""
+        files = self.collect(roots)
+        by_size = {}
+        for path, (size, _, _) in files.items():
+            if size: by_size.setdefault(size, []).append(path)
+        candidates = [p for group in by_size.values() if len(group) > 1 for p in group]
+        log(f"{len(files)} media files, {len(candidates)} share their size with another file.")
+
+        # Incremental: reuse stored hashes while size and mtime are unchanged
+        known = self.index.get_content_hashes() if self.index else {}
+        hashes, todo = {}, []
+        for p in candidates:
+            row = known.get(p)
+            if row and row[0] == files[p][0] and row[1] == files[p][1]: hashes[p] = row[2]
+            else: todo.append(p)
+        log(f"{len(hashes)} hashes cached, hashing {len(todo)} files...")
+
+        rows = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            futures = {pool.submit(self.hash_file, p): p for p in todo}
+            for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                if is_cancelled():
+                    for f in futures: f.cancel()
+                    break
+                path = futures[future]
+                try:
+                    hashes[path] = future.result()
+                    rows.append((path, files[path][0], files[path][1], hashes[path]))
+                except (OSError, ValueError) as e: log(f"Could not read {os.path.basename(path)}: {e}")
+                if len(rows) >= 500:
+                    if self.index: self.index.save_content_hashes(rows)
+                    rows = []
+                progress(0.8 * (i + 1) / max(1, len(todo)))
+        if self.index and rows: self.index.save_content_hashes(rows)
+        if is_cancelled(): return
+
+        groups = {}
+        for path, digest in hashes.items(): groups.setdefault(digest, []).append(path)
+        # The manifest accumulates across runs; links made earlier stay listed
+        manifest_path = os.path.join(roots[0], self.MANIFEST)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f: previous = json.load(f).get("linked", [])
+        except (OSError, ValueError): previous = []
+        linked = {e["path"]: e for e in previous if e.get("path") in files}
+        unlinked = []
+        dup_groups = [sorted(g) for g in groups.values() if len(g) > 1]
+        for i, group in enumerate(dup_groups):
+            # Keep the shallowest copy: the main folders win over re-extracted packages
+            keep = min(group, key=lambda p: (p.count(os.sep), p))
+            for path in group:
+                if path == keep or files[path][2] == files[keep][2]: continue
+                method, reason = self._replace(keep, path)
+                entry = {"path": path, "original": keep, "hash": hashes[path], "size": files[path][0]}
+                if method:
+                    entry["method"] = method
+                    linked[path] = entry
+                    st = os.stat(path)
+                    if self.index: self.index.save_content_hashes([(path, st.st_size, st.st_mtime, hashes[path])])
+                else:
+                    entry["reason"] = reason
+                    unlinked.append(entry)
+            progress(0.8 + 0.2 * (i + 1) / len(dup_groups))
+
+        new_links = len(linked) - len([e for e in previous if e.get("path") in files])
+        manifest = {"updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "saved_bytes": sum(e.get("size", 0) for e in linked.values()),
+                    "linked": sorted(linked.values(), key=lambda e: e["path"]), "unlinked": unlinked}
+        with open(manifest_path, "w", encoding="utf-8") as f: json.dump(manifest, f, indent=2)
+        log(f"Done. {len(dup_groups)} duplicate groups, {new_links} files newly linked, "
+            f"{manifest['saved_bytes'] / 1e9:.2f} GB saved in total, {len(unlinked)} left as copies.")
+        log(f"Manifest: {manifest_path}")
+
+    def _replace(self, original, duplicate):
+        """
+        Swaps `duplicate` for a reflink or hardlink of `original`. Returns (method, failure reason).
+        The chat matcher pairs media by mtime, so the path keeps its own: a reflink gets it
+        restored, a hardlink (one shared inode) is only made when both mtimes already match.
+        """
+        tmp = duplicate + ".dedup-tmp"
+        reasons = []
+        st = os.stat(duplicate)
+        for method, make in (("reflink", self._reflink), ("hardlink", os.link)):
+            if method == "hardlink" and os.stat(original).st_mtime_ns != st.st_mtime_ns:
+                reasons.append("hardlink: modification times differ")
+                continue
+            try:
+                make(original, tmp)
+                if method == "reflink": os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+                # Atomic swap: the duplicate path never disappears
+                os.replace(tmp, duplicate)
+                return method, None
+            except (OSError, NotImplementedError) as e:
+                reasons.append(f"{method}: {e}")
+                try: os.remove(tmp)
+                except OSError: pass
+        return None, "; ".join(reasons)
+
+    @staticmethod
+    def _reflink(src, dst):
+        if not sys.platform.startswith("linux"): raise NotImplementedError("not supported on this platform")
+        import fcntl
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+dedup = StorageDeduplicator()
@@ -4,10 +4,12 @@ import json
 import shutil
 import concurrent.futures
 import time
+import calendar
 import zipfile
 from datetime import datetime
 from bs4 import BeautifulSoup
 from pathlib import Path
+from database.matcher import ChatMediaMatcher
 
 class MemoryDownloader:
     def __init__(self, status_callback, progress_callback):
@@ -21,10 +23,17 @@ class MemoryDownloader:
         try:
             self.status_callback("Extracting ZIP archive...")
             with zipfile.ZipFile(zip_path, 'r') as z:
-                files = z.namelist()
-                for i, file in enumerate(files):
+                files = z.infolist()
+                for i, info in enumerate(files):
                     if self.cancelled: break
-                    z.extract(file, extract_root)
+                    target = z.extract(info, extract_root)
+                    # extract() leaves the extraction time as mtime; restore the archived time,
+                    # chat media matching orders a day's files by it (ZIP times are taken as UTC)
+                    if not info.is_dir():
+                        try:
+                            stamp = calendar.timegm(info.date_time + (0, 0, 0))
+                            os.utime(target, (stamp, stamp))
+                        except (OSError, ValueError, OverflowError): pass
                     self.progress_callback((i + 1) / len(files) * 0.33)
             
             if self.cancelled: return False
@@ -86,11 +95,13 @@ class MemoryDownloader:
                     master_chats = json.load(f)
             except: pass
 
+        # Media is resolved once for all conversations so no file is handed out twice
+        matcher = ChatMediaMatcher(chat_media_path)
+        media_msgs = []
         html_files = [f for f in os.listdir(chat_html_dir) if f.endswith(".html")]
         for i, filename in enumerate(html_files):
             raw_name = os.path.splitext(filename)[0].replace("subpage_", "")
-            # Integrated resolution logic here
-            friend_name, msgs = self._parse_chat_html(os.path.join(chat_html_dir, filename), raw_name, chat_media_path)
+            friend_name, msgs, media = self._parse_chat_html(os.path.join(chat_html_dir, filename), raw_name)
             
             if friend_name and msgs:
                 target_key = friend_name if friend_name != "Unknown" else raw_name
@@ -98,21 +109,37 @@ class MemoryDownloader:
                 
                 seen = {f"{m.get('Created')}_{m.get('Content')}" for m in existing}
                 new_entries = [m for m in msgs if f"{m.get('Created')}_{m.get('Content')}" not in seen]
+                # Only messages that are kept claim a file
+                media_keys = {id(m) for m in media}
+                for m in new_entries:
+                    if id(m) in media_keys:
+                        matcher.add(len(media_msgs), m["Created"])
+                        media_msgs.append(m)
                 
                 master_chats[target_key] = existing + new_entries
             
             self.progress_callback(0.33 + ((i + 1) / len(html_files) * 0.33))
+
+        for key, filename in matcher.resolve().items():
+            media_msgs[key]["Media IDs"] = os.path.splitext(filename)[0]
+        if matcher.ambiguous:
+            self.status_callback(f"{len(matcher.ambiguous)} chat media matches are uncertain")
+            for _, timestamp, reason in matcher.ambiguous: print(f"[WARN] Chat media {timestamp}: {reason}")
             
         with open(staged_chat_path, "w", encoding="utf-8") as f: 
             json.dump(master_chats, f, indent=4)
 
-    def _parse_chat_html(self, file_path, fallback_name, chat_media_path):
-        """Refined parser that resolves media using timestamp matching."""
+    def _parse_chat_html(self, file_path, fallback_name):
+        """
+        Parses one conversation. Returns (name, messages, media messages); media messages get
+        their Media IDs once the caller has matched them to chat_media files.
+        """
         try:
             with open(file_path, 'r', encoding='utf-8') as f: 
                 soup = BeautifulSoup(f, 'html.parser')
             
-            messages = []
+            messages, media = [], []
+            seen_media = set()
             message_blocks = soup.find_all(['span'], recursive=True)
             
             for block in message_blocks:
@@ -127,51 +154,27 @@ class MemoryDownloader:
                 content = content_tag.text.strip() if content_tag else ""
                 timestamp = ts_tag.text.strip()
                 
-                media_ids = ""
-                # Deep Search Resolution: Match physical media to HTML timestamp
-                if media_indicator:
-                    media_ids = self._resolve_physical_media(timestamp, chat_media_path)
-
                 msg_data = {
                     "From": sender, 
                     "Created": timestamp, 
                     "Content": content, 
-                    "Media IDs": media_ids
+                    "Media IDs": ""
                 }
                 
-                if msg_data not in messages:
+                if media_indicator:
+                    # Nested spans reach the same message element again; distinct media messages
+                    # sent in the same second are different elements and must both be kept
+                    if id(ts_tag) in seen_media: continue
+                    seen_media.add(id(ts_tag))
+                    messages.append(msg_data)
+                    media.append(msg_data)
+                elif msg_data not in messages:
                     messages.append(msg_data)
             
-            return fallback_name, messages
+            return fallback_name, messages, media
         except Exception as e:
             print(f"Error parsing {file_path}: {e}")
-            return None, []
-
-    def _resolve_physical_media(self, timestamp_str, chat_media_path):
-        """
-        Implementation of the matching logic from converter.py.
-        Attempts to link HTML records to physical files in chat_media.
-        """
-        if not chat_media_path.exists():
-            return ""
-            
-        # Format: 2025-07-05 09:25:12 UTC -> 2025-07-05
-        date_part = timestamp_str.split(' ')[0]
-        
-        candidates = []
-        for f in chat_media_path.iterdir():
-            if f.name.startswith(date_part):
-                candidates.append(f)
-        
-        if not candidates:
-            return ""
-
-        # Prefer variants that aren't overlays or thumbnails
-        primary = [c for c in candidates if not any(x in c.name for x in ["overlay", "thumbnail"])]
-        selected = primary[0] if primary else candidates[0]
-        
-        # Return as an ID (filename base) for the loader to map
-        return os.path.splitext(selected.name)[0]
+            return None, [], []
 
     def download_memories(self, json_path, download_folder):
         if not os.path.exists(json_path): return
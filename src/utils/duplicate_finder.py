@@ -0,0 +1,218 @@
+import os
+import concurrent.futures
+import numpy as np
+from PIL import Image
+from utils.image_utils import extract_video_thumbnail, get_image_thumbnail
+
+VIDEO_EXTS = ('.mp4', '.mov', '.avi')
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.webp')
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+_DCT32 = _dct_matrix(32)
+_BITS = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+def _pack(bits):
+    """(N, 64) booleans -> N unsigned 64-bit ints."""
+    return (bits.reshape(len(bits), 64).astype(np.uint64) * _BITS).sum(axis=1, dtype=np.uint64)
+
+def dhash_batch(small):
+    """Difference hashes of (N, 8, 9) grayscale arrays: one bit per horizontal gradient sign."""
+    return _pack(small[:, :, 1:] > small[:, :, :-1])
+
+def phash_batch(gray):
+    """DCT hashes of (N, 32, 32) grayscale arrays: low 8x8 frequencies against their median."""
+    coeffs = np.einsum("ij,njk,lk->nil", _DCT32, gray, _DCT32)[:, :8, :8].reshape(len(gray), 64)
+    median = np.median(coeffs[:, 1:], axis=1)
+    return _pack(coeffs > median[:, None])
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def popcount(x):
+    """Bit counts of a uint64 array."""
+    x = np.ascontiguousarray(x, dtype=np.uint64)
+    return _POPCOUNT8[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1, dtype=np.int64)
+
+class MultiIndexHash:
+    """
+    Hamming-radius index over 64-bit hashes. The bits are split into radius + 1 chunks;
+    two hashes within `radius` must agree exactly on at least one chunk (pigeonhole),
+    so candidate pairs are runs of equal chunk values after a sort, and only those
+    are compared. All steps are NumPy array operations. Hashes should be distinct
+    (collapse exact copies first); runs longer than BIG_RUN are compared row by row
+    so one crowded chunk value cannot blow up memory.
+    """
+    BIG_RUN = 512
+
+    def __init__(self, hashes, radius):
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        self.radius = radius
+        n_chunks = radius + 1
+        widths = [64 // n_chunks + (1 if c < 64 % n_chunks else 0) for c in range(n_chunks)]
+        self.chunks, shift = [], 0
+        for w in widths:
+            self.chunks.append((np.uint64(shift), np.uint64((1 << w) - 1)))
+            shift += w
+
+    def search(self, h, radius=None):
+        """(positions, distances) of stored hashes within radius of h."""
+        d = popcount(self.hashes ^ np.uint64(h))
+        hits = np.nonzero(d <= (self.radius if radius is None else radius))[0]
+        return hits, d[hits]
+
+    def pairs(self):
+        """(a, b) position arrays of every pair within the radius; a pair may repeat across chunks."""
+        out_a, out_b = [], []
+        for shift, mask in self.chunks:
+            keys = (self.hashes >> shift) & mask
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            sizes = np.diff(np.r_[starts, len(keys)])
+            # Groups of equal size are expanded together into all their index pairs
+            for size in np.unique(sizes[(sizes > 1) & (sizes <= self.BIG_RUN)]):
+                group_starts = starts[sizes == size]
+                iu, ju = np.triu_indices(size, k=1)
+                a = order[group_starts[:, None] + iu[None, :]].ravel()
+                b = order[group_starts[:, None] + ju[None, :]].ravel()
+                close = popcount(self.hashes[a] ^ self.hashes[b]) <= self.radius
+                out_a.append(a[close])
+                out_b.append(b[close])
+            big = sizes > self.BIG_RUN
+            for start, size in zip(starts[big].tolist(), sizes[big].tolist()):
+                members = order[start:start + size]
+                for r in range(size - 1):
+                    rest = members[r + 1:]
+                    close = popcount(self.hashes[rest] ^ self.hashes[members[r]]) <= self.radius
+                    out_a.append(np.full(int(close.sum()), members[r], dtype=members.dtype))
+                    out_b.append(rest[close])
+        if not out_a: return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(out_a), np.concatenate(out_b)
+
+class DuplicateFinder:
+    """
+    Perceptual fingerprints (pHash + dHash) for photos and video first frames.
+    Fingerprints come from the cached 400px preview that the grids already use, so a file
+    is decoded at most once for both; hashes are stored in the archive index and only new
+    or changed files are processed. Near-duplicates are found with a multi-index
+    Hamming search on pHash and confirmed by dHash.
+    """
+    _instance = None
+    WORKERS = 4
+    BATCH = 256
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DuplicateFinder, cls).__new__(cls)
+            cls._instance.index = None
+            cls._instance.stat = None
+            cls._instance.hashes = {}   # path -> (phash, dhash)
+            cls._instance.table = None
+        return cls._instance
+
+    def attach(self, archive_index, stat=None):
+        """stat(path) -> (size, mtime) or None, as for the waveform store."""
+        self.index = archive_index
+        self.stat = stat
+        self.hashes = {}
+        self.table = None
+
+    def _file_stat(self, path):
+        if self.stat: return self.stat(path)
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime
+        except OSError: return None
+
+    @staticmethod
+    def _decode(path):
+        """Two grayscale samplings of the cached preview: 32x32 for pHash, 9x8 for dHash."""
+        img = extract_video_thumbnail(path) if path.lower().endswith(VIDEO_EXTS) else get_image_thumbnail(path)
+        if img is None: return None
+        gray = img.convert("L")
+        return (np.asarray(gray.resize((32, 32), Image.Resampling.LANCZOS), dtype=np.float64),
+                np.asarray(gray.resize((9, 8), Image.Resampling.LANCZOS), dtype=np.int16))
+
+    def scan(self, paths, log, progress, is_cancelled=lambda: False):
+        """Fingerprints every photo/video that has no stored hash for its current size and mtime."""
+        paths = sorted({p for p in paths if p and p.lower().endswith(VIDEO_EXTS + IMAGE_EXTS)})
+        stats = {p: self._file_stat(p) for p in paths}
+        known = self.index.get_fingerprints() if self.index else {}
+        todo = []
+        for p in paths:
+            st = stats[p]
+            if not st: continue
+            row = known.get(p)
+            if row and row[0] == st[0] and row[1] == st[1]: self.hashes[p] = (row[2], row[3])
+            else: todo.append(p)
+        log(f"{len(self.hashes)} fingerprints cached, {len(todo)} files to analyze...")
+
+        failed = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            for start in range(0, len(todo), self.BATCH):
+                if is_cancelled(): break
+                batch = todo[start:start + self.BATCH]
+                decoded = [(p, d) for p, d in zip(batch, pool.map(self._safe_decode, batch)) if d is not None]
+                failed += len(batch) - len(decoded)
+                if decoded:
+                    ph = phash_batch(np.stack([d[0] for _, d in decoded]))
+                    dh = dhash_batch(np.stack([d[1] for _, d in decoded]))
+                    rows = []
+                    for (p, _), a, b in zip(decoded, ph.tolist(), dh.tolist()):
+                        self.hashes[p] = (a, b)
+                        rows.append((p, stats[p][0], stats[p][1], a, b))
+                    if self.index: self.index.save_fingerprints(rows)
+                progress(min(1.0, (start + len(batch)) / len(todo)))
+        self.table = None
+        if failed: log(f"{failed} files could not be decoded.")
+
+    def _safe_decode(self, path):
+        try: return self._decode(path)
+        except Exception: return None
+
+    def _build_table(self, radius):
+        """
+        (paths, node of each path, index over distinct (pHash, dHash) nodes, node dHashes).
+        Files with identical fingerprints (blank frames, repeated stickers) share one node.
+        """
+        if self.table is None or self.table[0] != radius:
+            paths = list(self.hashes)
+            both = np.array([self.hashes[p] for p in paths], dtype=np.uint64).reshape(len(paths), 2)
+            nodes, node_of = np.unique(both, axis=0, return_inverse=True)
+            self.table = (radius, paths, node_of.ravel(), MultiIndexHash(nodes[:, 0], radius), nodes[:, 1])
+        return self.table[1:]
+
+    def similar(self, path, radius=4):
+        """[(distance, path)] of fingerprinted files that look like `path`, closest first."""
+        if path not in self.hashes: return []
+        paths, node_of, table, dh = self._build_table(radius)
+        hits, dist = table.search(self.hashes[path][0])
+        confirm = popcount(dh[hits] ^ np.uint64(self.hashes[path][1])) <= radius * 2
+        near = dict(zip(hits[confirm].tolist(), dist[confirm].tolist()))
+        return sorted((int(near[n]), paths[i]) for i, n in enumerate(node_of.tolist()) if n in near and paths[i] != path)
+
+    def clusters(self, radius=4):
+        """Groups of near-identical files, largest first. Each group is sorted by path."""
+        if not self.hashes: return []
+        paths, node_of, table, dh = self._build_table(radius)
+        a, b = table.pairs()
+        keep = popcount(dh[a] ^ dh[b]) <= radius * 2
+        a, b = a[keep].tolist(), b[keep].tolist()
+        parent = {}
+        def find(i):
+            while parent.get(i, i) != i:
+                parent[i] = parent.get(parent[i], parent[i])
+                i = parent[i]
+            return i
+        for i, j in zip(a, b):
+            ri, rj = find(i), find(j)
+            if ri != rj: parent[ri] = rj
+        groups = {}
+        for i, node in enumerate(node_of.tolist()): groups.setdefault(find(node), []).append(paths[i])
+        return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+
+duplicates = DuplicateFinder()
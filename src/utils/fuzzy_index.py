@@ -0,0 +1,72 @@
+import re
+from collections import Counter, defaultdict
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+
+def trigrams(text):
+    """Character trigrams of a lowercased, space-padded string ('  ab', ' abc', ...)."""
+    t = f"  {text.lower()} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+def parse_month_expression(text):
+    """
+    Recognises date expressions such as '2019', 'mar 2019', 'March 2019', '2019 march',
+    '2019-03', '2019/3' or '03/2019'. Returns (year, month or None) or None.
+    """
+    t = text.strip().lower()
+    m = re.fullmatch(r"(\d{4})", t)
+    if m: return int(m.group(1)), None
+    m = re.fullmatch(r"(\d{4})\s*[-/.]\s*(\d{1,2})", t)
+    if m and 1 <= int(m.group(2)) <= 12: return int(m.group(1)), int(m.group(2))
+    m = re.fullmatch(r"(\d{1,2})\s*[-/.]\s*(\d{4})", t)
+    if m and 1 <= int(m.group(1)) <= 12: return int(m.group(2)), int(m.group(1))
+    m = re.fullmatch(r"([a-z]{3,})\.?\s*,?\s*(\d{4})", t) or re.fullmatch(r"(\d{4})\s*,?\s*([a-z]{3,})", t)
+    if m:
+        word, year = (m.group(1), m.group(2)) if m.group(1).isalpha() else (m.group(2), m.group(1))
+        for i, name in enumerate(MONTHS):
+            if name.startswith(word): return int(year), i + 1
+    return None
+
+class FuzzyIndex:
+    """
+    Trigram index for typo-tolerant lookup of short strings (names, usernames, chat keys).
+    Each entry has one or more texts and an arbitrary payload. Candidates come from the
+    posting lists of the query's trigrams; ranking is trigram Jaccard similarity with a
+    bonus for prefix and substring matches.
+    """
+    MIN_SIMILARITY = 0.2
+
+    def __init__(self):
+        self.entries = []       # (payload, lowercase texts, trigram count)
+        self.postings = defaultdict(list)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, texts, payload):
+        texts = [t.lower() for t in texts if t]
+        grams = set()
+        for t in texts: grams |= trigrams(t)
+        entry_id = len(self.entries)
+        for g in grams: self.postings[g].append(entry_id)
+        self.entries.append((payload, texts, len(grams)))
+
+    def search(self, query, limit=10, kind=None):
+        q = query.strip().lower()
+        if not q: return []
+        q_grams = trigrams(q)
+        shared = Counter()
+        for g in q_grams:
+            for entry_id in self.postings.get(g, ()): shared[entry_id] += 1
+
+        scored = []
+        for entry_id, n in shared.items():
+            payload, texts, n_grams = self.entries[entry_id]
+            if kind and payload.get("kind") != kind: continue
+            score = n / (len(q_grams) + n_grams - n)
+            if any(t.startswith(q) for t in texts): score += 1.0
+            elif any(q in t for t in texts): score += 0.5
+            if score >= self.MIN_SIMILARITY: scored.append((score, entry_id))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [self.entries[entry_id][0] for _, entry_id in scored[:limit]]
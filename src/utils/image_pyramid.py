@@ -0,0 +1,138 @@
+import os
+import json
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+from PIL import Image
+from utils.cache_manager import cache
+
+TILE = 256
+
+class ImagePyramid:
+    """
+    Multi-resolution tile pyramid for one still image, cached next to the thumbnails.
+    Level 0 is full resolution and every level halves the previous one. The source is
+    decoded once at build time; rendering only opens the tiles intersecting the viewport.
+    """
+    MAX_TILES_IN_MEMORY = 256
+    _tiles = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, image_path):
+        self.path = image_path
+        norm_path = os.path.normpath(os.path.abspath(image_path))
+        # Size and mtime are part of the key: a replaced or repaired image gets fresh tiles
+        try:
+            st = os.stat(image_path)
+            key = f"{norm_path}|{st.st_size}|{st.st_mtime_ns}"
+        except OSError: key = norm_path
+        self.dir = cache.cache_dir / "Pyramids" / hashlib.md5(key.encode('utf-8')).hexdigest()
+        self.level_sizes = []
+        self._load_meta()
+
+    @property
+    def ready(self):
+        return bool(self.level_sizes)
+
+    @property
+    def size(self):
+        return tuple(self.level_sizes[0])
+
+    def _load_meta(self):
+        meta_path = self.dir / "meta.json"
+        if not meta_path.exists(): return
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self.level_sizes = json.load(f).get("levels", [])
+        except:
+            self.level_sizes = []
+
+    def build(self):
+        """Cuts every level into JPEG tiles. Safe to call from a worker thread."""
+        if self.ready: return True
+        from utils.media_resolver import MediaResolver
+        img = MediaResolver.get_display_image(self.path)
+        if not img: return False
+
+        try:
+            img = img.convert("RGB")
+            self.dir.mkdir(parents=True, exist_ok=True)
+            sizes = []
+            level = 0
+            while True:
+                w, h = img.size
+                sizes.append([w, h])
+                for ty in range(math.ceil(h / TILE)):
+                    for tx in range(math.ceil(w / TILE)):
+                        box = (tx * TILE, ty * TILE, min(w, (tx + 1) * TILE), min(h, (ty + 1) * TILE))
+                        img.crop(box).save(self.dir / f"{level}_{tx}_{ty}.jpg", "JPEG", quality=90)
+                if max(w, h) <= TILE: break
+                img = img.reduce(2)
+                level += 1
+
+            with open(self.dir / "meta.json", "w", encoding="utf-8") as f:
+                json.dump({"levels": sizes}, f)
+            self.level_sizes = sizes
+            return True
+        except Exception as e:
+            print(f"[ERROR] Pyramid build failed: {e}")
+            return False
+
+    def level_for(self, scale):
+        """Coarsest level that still has at least one source pixel per screen pixel."""
+        if scale >= 1: return 0
+        level = int(math.floor(math.log2(1 / scale)))
+        return max(0, min(level, len(self.level_sizes) - 1))
+
+    def _tile(self, level, tx, ty):
+        key = (str(self.dir), level, tx, ty)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                return tile
+        try:
+            tile = Image.open(self.dir / f"{level}_{tx}_{ty}.jpg")
+            tile.load()
+        except:
+            return None
+        with self._lock:
+            self._tiles[key] = tile
+            while len(self._tiles) > self.MAX_TILES_IN_MEMORY:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def render(self, view_size, scale, center):
+        """
+        Composes the viewport image. `scale` is screen pixels per full-resolution pixel and
+        `center` is the full-resolution point shown in the middle of the viewport.
+        """
+        view_w, view_h = view_size
+        level = self.level_for(scale)
+        factor = 2 ** level
+        lw, lh = self.level_sizes[level]
+        level_scale = scale * factor
+
+        # Viewport expressed in level pixels
+        lx0 = center[0] / factor - view_w / 2 / level_scale
+        ly0 = center[1] / factor - view_h / 2 / level_scale
+        bx0, by0 = max(0, int(math.floor(lx0))), max(0, int(math.floor(ly0)))
+        bx1 = min(lw, int(math.ceil(lx0 + view_w / level_scale)))
+        by1 = min(lh, int(math.ceil(ly0 + view_h / level_scale)))
+
+        out = Image.new("RGB", (view_w, view_h), (0, 0, 0))
+        if bx1 <= bx0 or by1 <= by0: return out
+
+        region = Image.new("RGB", (bx1 - bx0, by1 - by0))
+        for ty in range(by0 // TILE, (by1 - 1) // TILE + 1):
+            for tx in range(bx0 // TILE, (bx1 - 1) // TILE + 1):
+                tile = self._tile(level, tx, ty)
+                if tile: region.paste(tile, (tx * TILE - bx0, ty * TILE - by0))
+
+        out_w = max(1, round(region.width * level_scale))
+        out_h = max(1, round(region.height * level_scale))
+        if (out_w, out_h) != region.size:
+            region = region.resize((out_w, out_h), Image.Resampling.BILINEAR)
+        out.paste(region, (round((bx0 - lx0) * level_scale), round((by0 - ly0) * level_scale)))
+        return out
@@ -68,6 +68,25 @@ def extract_video_thumbnail(video_path):
         cache.save(video_path, extracted_img)
     return extracted_img
 
+def get_image_thumbnail(image_path, max_dim=400):
+    """
+    Returns a cached preview of a still image (caption composited).
+    The same entry is reused by the grids and the viewer's instant preview.
+    """
+    if not os.path.exists(image_path): return None
+    cached_img = cache.get(image_path)
+    if cached_img: return cached_img
+
+    from utils.media_resolver import MediaResolver
+    pil_img = MediaResolver.get_display_image(image_path)
+    if not pil_img: return None
+    try:
+        pil_img.thumbnail((max_dim, max_dim))
+    except Exception:
+        return None
+    cache.save(image_path, pil_img)
+    return pil_img
+
 def add_play_icon(pil_img):
     """Overlays a generated play icon onto a thumbnail."""
     if not pil_img: return None #
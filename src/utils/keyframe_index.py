@@ -0,0 +1,63 @@
+import os
+import subprocess
+from bisect import bisect_left
+from utils.cache_manager import cache
+from utils.repair import EnvironmentManager
+
+class KeyframeIndex:
+    """
+    Sorted keyframe timestamps (seconds) for one video.
+    Built once from packet flags via ffprobe (no decoding) and cached next to the thumbnail,
+    together with the file's size and mtime so a replaced or re-encoded file is probed again.
+    """
+    CACHE_KIND = "keyframes"
+
+    def __init__(self, times):
+        self.times = times
+
+    @classmethod
+    def load_or_build(cls, video_path):
+        try:
+            st = os.stat(video_path)
+            stamp = [st.st_size, st.st_mtime]
+        except OSError: return None
+        cached = cache.get_meta(video_path, cls.CACHE_KIND)
+        if isinstance(cached, dict) and cached.get("stat") == stamp and cached.get("times"):
+            return cls(cached["times"])
+
+        times = cls._probe_keyframes(video_path)
+        if not times: return None
+        cache.save_meta(video_path, cls.CACHE_KIND, {"stat": stamp, "times": times})
+        return cls(times)
+
+    @staticmethod
+    def _probe_keyframes(video_path):
+        ffprobe = EnvironmentManager.get_ffprobe()
+        if not ffprobe or not os.path.exists(video_path): return []
+        cmd = [
+            ffprobe, "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0", str(video_path)
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=20,
+                                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        except Exception:
+            return []
+
+        times = []
+        for line in result.stdout.splitlines():
+            pts, _, flags = line.partition(",")
+            if "K" not in flags: continue
+            try: times.append(round(float(pts), 3))
+            except ValueError: pass
+        return sorted(set(times))
+
+    def nearest(self, seconds):
+        """Keyframe closest to the given time (either neighbour)."""
+        i = bisect_left(self.times, seconds)
+        if i == 0: return self.times[0]
+        if i == len(self.times): return self.times[-1]
+        before, after = self.times[i - 1], self.times[i]
+        return before if seconds - before <= after - seconds else after
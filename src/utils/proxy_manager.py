@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import subprocess
+from pathlib import Path
+from utils.repair import EnvironmentManager
+
+VIDEO_EXTS = ('.mp4', '.mov', '.avi')
+
+class ProxyManager:
+    """
+    Cached low-resolution (720p H.264) playback copies of large videos.
+    Originals are never modified; the viewer falls back to them on demand.
+    """
+    _instance = None
+    PROXY_SHORT_SIDE = 720
+    MAX_SHORT_SIDE = 1080       # Anything above this gets a proxy
+    MAX_BITRATE = 8_000_000     # ... as does anything above ~8 Mbit/s
+    HEAVY_CODECS = ("hevc", "h265", "vp9", "av1")
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ProxyManager, cls).__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def init(self):
+        """Proxies live next to the thumbnail cache in Local AppData."""
+        if self.initialized: return
+        local_dir = os.environ.get('LOCALAPPDATA', os.environ.get('TEMP', os.getcwd()))
+        self.proxy_dir = Path(local_dir) / "SnapCapsule" / "Proxies"
+        self.proxy_dir.mkdir(parents=True, exist_ok=True)
+        self.initialized = True
+
+    def get(self, video_path):
+        """Returns the proxy path if an up-to-date proxy exists, else None."""
+        if not self.initialized or not video_path: return None
+        proxy_path = self._get_path(video_path)
+        try:
+            if proxy_path.exists() and proxy_path.stat().st_mtime >= os.path.getmtime(video_path):
+                return str(proxy_path)
+        except OSError:
+            pass
+        return None
+
+    def needs_proxy(self, video_path, ffprobe):
+        cmd = [
+            ffprobe, "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "stream=width,height,codec_name,bit_rate:format=bit_rate",
+            "-of", "json", str(video_path)
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10,
+                                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+            info = json.loads(result.stdout or "{}")
+        except Exception:
+            return False
+
+        streams = info.get("streams") or []
+        if not streams: return False
+        stream = streams[0]
+        short_side = min(int(stream.get("width") or 0), int(stream.get("height") or 0))
+        bitrate = int(stream.get("bit_rate") or info.get("format", {}).get("bit_rate") or 0)
+        codec = (stream.get("codec_name") or "").lower()
+        return short_side > self.MAX_SHORT_SIDE or bitrate > self.MAX_BITRATE or codec in self.HEAVY_CODECS
+
+    def generate(self, video_path, ffmpeg):
+        proxy_path = self._get_path(video_path)
+        tmp_path = proxy_path.with_suffix(".tmp.mp4")
+        side = self.PROXY_SHORT_SIDE
+        # Scale the shorter side to 720 (Snap videos are mostly portrait), never upscale
+        scale = f"scale='if(gt(iw,ih),-2,min({side},iw))':'if(gt(iw,ih),min({side},ih),-2)'"
+        cmd = [
+            ffmpeg, "-y", "-v", "error", "-i", str(video_path),
+            "-vf", scale,
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "26",
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-b:a", "128k",
+            "-movflags", "+faststart",
+            str(tmp_path)
+        ]
+        ok = subprocess.run(cmd, capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0).returncode == 0
+        if ok:
+            os.replace(tmp_path, proxy_path)
+        elif tmp_path.exists():
+            tmp_path.unlink()
+        return ok
+
+    def generate_all(self, video_paths, log, progress, is_cancelled=lambda: False):
+        """Background job: builds missing proxies for videos above the thresholds."""
+        self.init()
+        ffmpeg = EnvironmentManager.get_ffmpeg()
+        ffprobe = EnvironmentManager.get_ffprobe()
+        if not ffprobe:
+            log("ffprobe not found; cannot inspect videos.")
+            return
+
+        paths = sorted({p for p in video_paths if p and p.lower().endswith(VIDEO_EXTS) and os.path.exists(p)})
+        made, skipped, failed = 0, 0, 0
+        for i, path in enumerate(paths):
+            if is_cancelled(): break
+            if self.get(path) or not self.needs_proxy(path, ffprobe):
+                skipped += 1
+            elif self.generate(path, ffmpeg):
+                made += 1
+                log(f"Proxy created: {os.path.basename(path)}")
+            else:
+                failed += 1
+                log(f"Proxy failed: {os.path.basename(path)}")
+            progress((i + 1) / len(paths))
+        log(f"Done. {made} created, {skipped} not needed, {failed} failed.")
+
+    def _get_path(self, video_path):
+        norm_path = os.path.normpath(os.path.abspath(video_path))
+        h = hashlib.md5(norm_path.encode('utf-8')).hexdigest()
+        return self.proxy_dir / f"{h}.mp4"
+
+proxies = ProxyManager()
@@ -94,11 +94,26 @@ class MediaRepairCore:
 
 class EnvironmentManager:
     @staticmethod
-    def get_ffmpeg():
+    def get_ffprobe():
+        """Locates ffprobe without triggering a download. Returns None if unavailable."""
+        if shutil.which("ffprobe"): return "ffprobe"
+        bin_dir = Path(__file__).parent.parent / "bin"
+        ffprobe_exe = bin_dir / ("ffprobe.exe" if os.name == 'nt' else "ffprobe")
+        return str(ffprobe_exe) if ffprobe_exe.exists() else None
+
+    @staticmethod
+    def find_ffmpeg():
+        """Installed ffmpeg (PATH or bundled bin), or None. Never downloads."""
         if shutil.which("ffmpeg"): return "ffmpeg"
+        ffmpeg_exe = Path(__file__).parent.parent / "bin" / ("ffmpeg.exe" if os.name == 'nt' else "ffmpeg")
+        return str(ffmpeg_exe) if ffmpeg_exe.exists() else None
+
+    @staticmethod
+    def get_ffmpeg():
+        found = EnvironmentManager.find_ffmpeg()
+        if found: return found
         bin_dir = Path(__file__).parent.parent / "bin"
         ffmpeg_exe = bin_dir / ("ffmpeg.exe" if os.name == 'nt' else "ffmpeg")
-        if ffmpeg_exe.exists(): return str(ffmpeg_exe)
         
         bin_dir.mkdir(parents=True, exist_ok=True)
         if os.name == 'nt':
@@ -0,0 +1,146 @@
+import os
+import heapq
+import itertools
+import threading
+import customtkinter as ctk
+from PIL import Image, ImageOps
+from utils.image_utils import extract_video_thumbnail, get_image_thumbnail, add_play_icon
+from utils.ui_dispatcher import dispatcher
+
+VIDEO_EXTS = ('.mp4', '.mov', '.avi')
+
+# Priorities: lower runs first. Visible widgets use VISIBLE, prefetch uses VISIBLE + distance.
+VISIBLE = 0
+PREFETCH = 100
+
+class _Ticket:
+    __slots__ = ("owner", "path", "size", "mode", "callback", "priority", "cancelled", "started")
+
+    def __init__(self, owner, path, size, mode, callback, priority):
+        self.owner = owner
+        self.path = path
+        self.size = size
+        self.mode = mode
+        self.callback = callback
+        self.priority = priority
+        self.cancelled = False
+        self.started = False
+
+class ThumbnailService:
+    """
+    Shared background loader for grid and chat thumbnails.
+    Work is ordered by priority (on-screen first, then prefetch distance); every owner
+    (usually the widget showing the image) has at most one live request, so rebinding or
+    destroying a widget cancels its old work. Decoding, resizing and play-icon compositing
+    all happen on the worker threads; callbacks receive a ready CTkImage on the Tk thread.
+    """
+    _instance = None
+    WORKERS = 4
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ThumbnailService, cls).__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def _start(self):
+        if self.initialized: return
+        self._heap = []
+        self._seq = itertools.count()
+        self._tickets = {}      # owner -> live ticket
+        self._cond = threading.Condition()
+        for i in range(self.WORKERS):
+            threading.Thread(target=self._worker, name=f"thumb-{i}", daemon=True).start()
+        self.initialized = True
+
+    # --- Public API (Tk thread) ---
+
+    def request(self, owner, path, size, callback, mode="fit", priority=VISIBLE):
+        """
+        Queues a thumbnail for `owner`, replacing any request it already has.
+        mode "fit" crops to exactly `size`; "contain" scales within `size`.
+        callback(ctk_image, status) runs on the Tk thread with status ok, missing or failed.
+        """
+        self._start()
+        with self._cond:
+            old = self._tickets.get(owner)
+            if old: old.cancelled = True
+            ticket = _Ticket(owner, path, tuple(size), mode, callback, priority)
+            self._tickets[owner] = ticket
+            heapq.heappush(self._heap, (priority, next(self._seq), ticket))
+            self._cond.notify()
+        return ticket
+
+    def prefetch(self, path, distance=0):
+        """Warms the disk cache for an upcoming item; nothing is delivered."""
+        return self.request(("prefetch", path), path, (0, 0), None, mode="cache", priority=PREFETCH + distance)
+
+    def cancel(self, owner):
+        with self._cond:
+            ticket = self._tickets.pop(owner, None)
+            if ticket: ticket.cancelled = True
+
+    def cancel_prefetch(self):
+        with self._cond:
+            for owner in [o for o in self._tickets if isinstance(o, tuple) and o[0] == "prefetch"]:
+                self._tickets.pop(owner).cancelled = True
+
+    def set_priority(self, owner, priority):
+        """Re-queues a pending request, e.g. when its widget scrolls into view."""
+        with self._cond:
+            ticket = self._tickets.get(owner)
+            if not ticket or ticket.started or ticket.priority == priority: return
+            ticket.priority = priority
+            # The old heap entry becomes stale and is skipped by the workers
+            heapq.heappush(self._heap, (priority, next(self._seq), ticket))
+            self._cond.notify()
+
+    # --- Workers ---
+
+    def _next_ticket(self):
+        with self._cond:
+            while True:
+                while not self._heap: self._cond.wait()
+                priority, _, ticket = heapq.heappop(self._heap)
+                if ticket.cancelled or ticket.started or priority != ticket.priority: continue
+                if self._tickets.get(ticket.owner) is not ticket: continue
+                ticket.started = True
+                return ticket
+
+    def _worker(self):
+        while True:
+            ticket = self._next_ticket()
+            try: status, img = self._render(ticket)
+            except Exception: status, img = "failed", None
+            if ticket.cancelled or ticket.callback is None:
+                with self._cond:
+                    if self._tickets.get(ticket.owner) is ticket: del self._tickets[ticket.owner]
+                continue
+            # Results land in per-frame batches on the Tk thread
+            dispatcher.post(self._deliver, ticket, status, img)
+
+    def _render(self, ticket):
+        path = ticket.path
+        if not path or not os.path.exists(path): return "missing", None
+        is_video = path.lower().endswith(VIDEO_EXTS)
+        pil_img = extract_video_thumbnail(path) if is_video else get_image_thumbnail(path)
+        if not pil_img: return "failed", None
+        if ticket.mode == "cache": return "ok", None
+
+        if ticket.mode == "fit":
+            pil_img = ImageOps.fit(pil_img, ticket.size, method=Image.Resampling.LANCZOS)
+        else:
+            pil_img = pil_img.copy()
+            pil_img.thumbnail(ticket.size)
+        if is_video: pil_img = add_play_icon(pil_img)
+        return "ok", ctk.CTkImage(light_image=pil_img, dark_image=pil_img, size=pil_img.size)
+
+    def _deliver(self, ticket, status, img):
+        with self._cond:
+            if ticket.cancelled or self._tickets.get(ticket.owner) is not ticket: return
+            del self._tickets[ticket.owner]
+        try:
+            if ticket.owner.winfo_exists(): ticket.callback(img, status)
+        except Exception: pass
+
+thumbnails = ThumbnailService()
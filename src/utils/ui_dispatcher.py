@@ -0,0 +1,69 @@
+import time
+import threading
+from collections import deque
+
+class UIDispatcher:
+    """
+    Thread-safe hand-off from worker threads to the Tk main loop.
+    Workers never touch Tk: they post callables here and the main loop drains them
+    once per frame (~16 ms). Keyed updates (progress, status) are coalesced so only the
+    latest value per key is applied; everything else runs in order within a time budget.
+    """
+    _instance = None
+    FRAME_MS = 16
+    BUDGET_S = 0.008    # Leave the rest of the frame for input and redraws
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(UIDispatcher, cls).__new__(cls)
+            cls._instance.root = None
+            cls._instance._lock = threading.Lock()
+            cls._instance._queue = deque()
+            cls._instance._latest = {}
+        return cls._instance
+
+    def start(self, root):
+        """Called once by the main window; the drain timer lives as long as the root."""
+        if self.root is not None: return
+        self.root = root
+        root.after(self.FRAME_MS, self._drain)
+
+    def post(self, fn, *args):
+        with self._lock:
+            self._queue.append((fn, args))
+
+    def post_latest(self, key, fn, *args):
+        """Replaces any pending update with the same key."""
+        with self._lock:
+            self._latest[key] = (fn, args)
+
+    def wrap(self, fn):
+        """Callback that can be handed to worker code; every call is queued in order."""
+        return lambda *args: self.post(fn, *args)
+
+    def wrap_latest(self, fn, key=None):
+        """Callback for superseding updates such as progress; only the last call per frame lands."""
+        key = key or (id(getattr(fn, "__self__", fn)), getattr(fn, "__name__", ""))
+        return lambda *args: self.post_latest(key, fn, *args)
+
+    def _drain(self):
+        with self._lock:
+            latest, self._latest = self._latest, {}
+        for fn, args in latest.values():
+            self._run(fn, args)
+
+        deadline = time.perf_counter() + self.BUDGET_S
+        while time.perf_counter() < deadline:
+            with self._lock:
+                if not self._queue: break
+                fn, args = self._queue.popleft()
+            self._run(fn, args)
+
+        try: self.root.after(self.FRAME_MS, self._drain)
+        except Exception: pass  # Root destroyed
+
+    def _run(self, fn, args):
+        try: fn(*args)
+        except Exception as e: print(f"[ERROR] UI update failed: {e}")
+
+dispatcher = UIDispatcher()
@@ -0,0 +1,151 @@
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from PIL import Image
+
+RING_SLOTS = 4
+
+def _decode_worker(path, shm_name, bounds, slots, free_slots, ready, commands):
+    """
+    Runs in the helper process. Decodes with cv2, scales to the display size and
+    writes RGB frames straight into the shared ring. Only slot numbers cross the pipe.
+    """
+    import cv2
+    import numpy as np
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    cap = cv2.VideoCapture(path)
+    parent = mp.parent_process()
+    view = None
+    try:
+        if not cap.isOpened():
+            ready.put(("error", -1, 0, 0))
+            return
+
+        src_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or bounds[0]
+        src_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or bounds[1]
+        scale = min(bounds[0] / src_w, bounds[1] / src_h)
+        w, h = max(1, int(src_w * scale)), max(1, int(src_h * scale))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = max(float(cap.get(cv2.CAP_PROP_FPS)), 1.0)
+        ready.put(("meta", (w, h), total, fps))
+
+        slot_bytes = bounds[0] * bounds[1] * 3
+        epoch, slot, at_eof = 0, 0, False
+        while True:
+            if parent and not parent.is_alive(): return
+            try:
+                # Block only when idle at EOF; otherwise drain pending commands first
+                cmd, arg = commands.get(timeout=0.5) if at_eof else commands.get_nowait()
+                if cmd == "stop": return
+                if cmd == "seek":
+                    epoch += 1
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, arg)
+                    at_eof = False
+                continue
+            except queue.Empty:
+                if at_eof: continue
+
+            if not free_slots.acquire(timeout=0.1): continue
+            ret, frame = cap.read()
+            if not ret:
+                free_slots.release()
+                at_eof = True
+                ready.put(("eof", -1, epoch, 0))
+                continue
+
+            view = np.ndarray((h, w, 3), dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_LINEAR)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=view)
+            view = None
+            ready.put(("frame", slot, epoch, int(cap.get(cv2.CAP_PROP_POS_FRAMES))))
+            slot = (slot + 1) % slots
+    finally:
+        view = None
+        cap.release()
+        try: shm.close()
+        except BufferError: pass
+
+class SubprocessFrameSource:
+    """
+    Optional isolated decoder for GlobalMediaPlayer.
+    A corrupt file can only take down the helper process; frames are read from
+    a shared-memory ring without pickling them through a pipe. Each frame is copied
+    out of its slot once (Tk keeps the image alive) before the slot goes back to the decoder.
+    """
+
+    def __init__(self, path, bounds, slots=RING_SLOTS):
+        self.path = path
+        self.bounds = (max(1, int(bounds[0])), max(1, int(bounds[1])))
+        self.slots = slots
+        self.slot_bytes = self.bounds[0] * self.bounds[1] * 3
+        self.size = None
+        self.total_frames = 0
+        self.fps = 30.0
+        self.epoch = 0
+        self._process = None
+        self._shm = None
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slots)
+        self._free = ctx.Semaphore(self.slots)
+        self._ready = ctx.Queue()
+        self._commands = ctx.Queue()
+        self._process = ctx.Process(target=_decode_worker, daemon=True,
+                                    args=(self.path, self._shm.name, self.bounds, self.slots,
+                                          self._free, self._ready, self._commands))
+        self._process.start()
+        return self
+
+    def is_open(self):
+        return self._process is not None and (self._process.is_alive() or not self._ready.empty())
+
+    def read(self, bounds=None):
+        """Returns (status, image, frame_pos); status is frame, wait, eof or error."""
+        while True:
+            try:
+                kind, slot, a, b = self._ready.get_nowait()
+            except queue.Empty:
+                if self._process and not self._process.is_alive(): return "error", None, None
+                return "wait", None, None
+
+            if kind == "meta":
+                self.size, self.total_frames, self.fps = slot, a, b
+                continue
+            if kind == "error": return "error", None, None
+            if a != self.epoch:
+                # Decoded before the latest seek; hand the slot straight back
+                if kind == "frame": self._free.release()
+                continue
+            if kind == "eof": return "eof", None, None
+
+            w, h = self.size
+            offset = slot * self.slot_bytes
+            view = self._shm.buf[offset:offset + w * h * 3]
+            try:
+                # Copied: the displayed image must not alias a slot the decoder will overwrite
+                img = Image.frombuffer("RGB", (w, h), view, "raw", "RGB", 0, 1).copy()
+            finally:
+                view.release()
+                self._free.release()
+            return "frame", img, b
+
+    def seek(self, frame_pos, accurate=True):
+        if not self._process: return
+        self.epoch += 1
+        self._commands.put(("seek", int(frame_pos)))
+
+    def release(self):
+        if self._process:
+            try: self._commands.put(("stop", None))
+            except: pass
+            self._process.join(timeout=0.5)
+            if self._process.is_alive(): self._process.terminate()
+            self._process = None
+        if self._shm:
+            try: self._shm.close()
+            except BufferError: pass
+            try: self._shm.unlink()
+            except FileNotFoundError: pass
+            self._shm = None
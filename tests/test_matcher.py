@@ -0,0 +1,30 @@
+import os
+import calendar
+from database.matcher import match_nearest, ChatMediaMatcher
+
+def test_duplicate_keys_all_match():
+    matches = match_nearest([100] * 10, [100] * 10, 2)
+    assert len(matches) == 10
+    assert sorted(matches.values()) == list(range(10))
+
+def test_burst_within_tolerance_all_match():
+    matches = match_nearest(list(range(100, 108)), [100] * 8, 10)
+    assert len(matches) == 8
+
+def test_closest_pair_wins():
+    assert match_nearest([100, 103], [104, 100], 5) == {0: 1, 1: 0}
+
+def test_outside_tolerance_and_missing_keys():
+    assert match_nearest([100, None], [103, None], 2) == {}
+
+def test_chat_media_same_mtime_burst(tmp_path):
+    stamp = calendar.timegm((2021, 5, 1, 10, 0, 0))
+    for i in range(6):
+        path = tmp_path / f"2021-05-01_f{i}.jpg"
+        path.write_bytes(b"")
+        os.utime(path, (stamp, stamp))
+    matcher = ChatMediaMatcher(str(tmp_path))
+    for i in range(6): matcher.add(i, f"2021-05-01 10:00:0{i} UTC")
+    result = matcher.resolve()
+    assert len(set(result.values())) == 6
+    assert matcher.ambiguous == []